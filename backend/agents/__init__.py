@@ -2,5 +2,6 @@ from .technical_analyst import TechnicalAnalyst
 from .sentiment_analyst import SentimentAnalyst
 from .debate_team import DebateTeam
 from .trader import Trader
+from .composite_agent import CompositeAgent
 
-__all__ = ['TechnicalAnalyst', 'SentimentAnalyst', 'DebateTeam', 'Trader']
+__all__ = ['TechnicalAnalyst', 'SentimentAnalyst', 'DebateTeam', 'Trader', 'CompositeAgent']
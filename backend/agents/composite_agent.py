@@ -0,0 +1,124 @@
+from typing import Dict, Any, Tuple
+from services.llm_client import llm_client, system_blocks
+from services.data_loader import data_loader
+from .technical_analyst import TechnicalAnalyst
+from .sentiment_analyst import SentimentAnalyst
+from .debate_team import DebateTeam
+from .schemas import CompositeResult
+
+class CompositeAgent:
+    """
+    Composite Agent
+    Runs technical analysis, sentiment analysis and the full bull/bear
+    debate in ONE structured LLM call, for cheap deterministic backtests.
+    Results are returned in the same shapes the individual agents produce.
+    """
+
+    __slots__ = ("name", "model", "technical", "sentiment", "debate")
+
+    def __init__(self, technical: TechnicalAnalyst, sentiment: SentimentAnalyst, debate: DebateTeam):
+        self.name = "Composite Agent"
+        self.model = debate.model
+        self.technical = technical
+        self.sentiment = sentiment
+        self.debate = debate
+
+    async def run(
+        self,
+        ticker: str,
+        date: str,
+        rounds: int = 2
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Run every analysis stage for a ticker and date with a single LLM call
+
+        Args:
+            ticker: Stock ticker symbol
+            date: Analysis date
+            rounds: Number of debate rounds (1 or 2)
+
+        Returns:
+            (technical_analysis, sentiment_analysis, debate_result) tuple
+        """
+        indicators = data_loader.indicators_for(ticker, date)
+        sentiment_data = self.sentiment.load_sentiment(ticker, date, 7)
+
+        # Static market data prefix, prompt-cached when it's long enough to
+        # qualify (see system_blocks)
+        system = f"""You are a trading research desk analyzing {ticker} on {date}.
+
+MARKET DATA:
+{self.technical.format_indicators(indicators)}
+
+{self.sentiment.format_data(sentiment_data, 7)}
+"""
+
+        prompt = f"""Complete every stage below in order, each stage building on the previous ones.
+
+1. technical: Technical analysis - {self.technical.RESPONSE_KEYS}
+2. sentiment: Sentiment analysis - {self.sentiment.RESPONSE_KEYS}
+3. bull_r1: BULL advocate's opening argument for why to BUY {ticker} - argument, key_points (3-5), conviction (0-1)
+4. bear_r1: BEAR advocate's opening argument for caution on {ticker} - argument, key_points (3-5), conviction (0-1)
+{self._rebuttal_instructions(rounds)}
+{6 if rounds >= 2 else 5}. synth: A neutral judge's final decision on the debate - winning_side (Bull or Bear), action (BUY, SELL, HOLD), confidence (0-1), key_reasons (list)
+"""
+
+        # Call LLM (currently mocked)
+        # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
+        response = await llm_client.call_claude(
+            prompt,
+            model=self.model,
+            temperature=0.5,
+            response_schema=CompositeResult,
+            system=system_blocks(system, self.model)
+        )
+        result = CompositeResult.model_validate_json(response)
+
+        technical_analysis = {
+            **result.technical.model_dump(),
+            "indicators": indicators,
+            "agent": self.technical.name
+        }
+        sentiment_analysis = {
+            **result.sentiment.model_dump(),
+            "raw_data": {
+                "reddit_sentiment": sentiment_data['reddit_avg_sentiment'],
+                "twitter_sentiment": sentiment_data['twitter_avg_sentiment'],
+                "total_posts": sentiment_data['total_posts']
+            },
+            "agent": self.sentiment.name
+        }
+
+        debate_log = [
+            {"round": 1, "speaker": "Bull", "argument": result.bull_r1.argument},
+            {"round": 1, "speaker": "Bear", "argument": result.bear_r1.argument}
+        ]
+        if rounds >= 2 and result.bull_r2 is not None and result.bear_r2 is not None:
+            debate_log.append({"round": 2, "speaker": "Bull", "argument": result.bull_r2.argument})
+            debate_log.append({"round": 2, "speaker": "Bear", "argument": result.bear_r2.argument})
+
+        debate_result = {
+            "agent": self.debate.name,
+            "ticker": ticker,
+            "date": date,
+            "debate_log": debate_log,
+            "final_decision": result.synth.model_dump(),
+            "rounds_conducted": rounds
+        }
+
+        return technical_analysis, sentiment_analysis, debate_result
+
+    def _rebuttal_instructions(self, rounds: int) -> str:
+        """Instructions for the round 2 rebuttal stage, if requested"""
+        if rounds < 2:
+            return "Leave bull_r2 and bear_r2 empty."
+
+        return """5. bull_r2 / bear_r2: Rebuttals - the bull answers bear_r1, then the bear answers bull_r2 (same fields as round 1)"""
+
+    def get_status(self) -> Dict[str, str]:
+        """Get agent status"""
+        return {
+            "name": self.name,
+            "model": self.model,
+            "status": "active"
+        }
@@ -1,6 +1,7 @@
-import json
+import asyncio
 from typing import Dict, Any, List
-from services.llm_client import llm_client
+from services.llm_client import llm_client, system_blocks
+from .schemas import DebateArgument, DebateDecision
 
 class DebateTeam:
     """
@@ -9,6 +10,8 @@ class DebateTeam:
     Uses Claude Sonnet 4 for superior reasoning
     """
 
+    __slots__ = ("name", "model")
+
     def __init__(self):
         self.name = "Debate Team"
         self.model = "claude-sonnet-4-20250514"
@@ -35,32 +38,51 @@ class DebateTeam:
             Dict containing debate transcript and final recommendation
         """
         debate_log = []
-
-        # Round 1: Initial arguments
-        bull_arg_1 = await self._generate_bull_argument(
-            ticker, date, technical_analysis, sentiment_analysis, []
-        )
-        debate_log.append({"round": 1, "speaker": "Bull", "argument": bull_arg_1})
-
-        bear_arg_1 = await self._generate_bear_argument(
-            ticker, date, technical_analysis, sentiment_analysis, [bull_arg_1]
+        context = self._format_context(technical_analysis, sentiment_analysis)
+
+        # Round 1: Opening arguments are independent, so generate them concurrently
+        bull_1, bear_1 = await asyncio.gather(
+            self._generate_bull_argument(
+                ticker, date, context, []
+            ),
+            self._generate_bear_argument(
+                ticker, date, context, []
+            )
         )
-        debate_log.append({"round": 1, "speaker": "Bear", "argument": bear_arg_1})
-
-        # Round 2: Rebuttals (if requested)
-        if rounds >= 2:
-            bull_arg_2 = await self._generate_bull_argument(
-                ticker, date, technical_analysis, sentiment_analysis, [bull_arg_1, bear_arg_1]
+        debate_log.append({"round": 1, "speaker": "Bull", "argument": bull_1.argument})
+        debate_log.append({"round": 1, "speaker": "Bear", "argument": bear_1.argument})
+
+        if rounds < 2:
+            # Single round: judge the opening pair without another LLM call
+            final_decision = self._judge_by_conviction(bull_1, bear_1)
+        else:
+            # Round 2: Rebuttals - sequential, each side answers the other
+            bull_2 = await self._generate_bull_argument(
+                ticker, date, context, [bull_1.argument, bear_1.argument]
             )
-            debate_log.append({"round": 2, "speaker": "Bull", "argument": bull_arg_2})
+            debate_log.append({"round": 2, "speaker": "Bull", "argument": bull_2.argument})
 
-            bear_arg_2 = await self._generate_bear_argument(
-                ticker, date, technical_analysis, sentiment_analysis, [bull_arg_1, bear_arg_1, bull_arg_2]
+            # Speculatively synthesize while the bear's rebuttal is generated
+            synth_task = asyncio.create_task(
+                self._synthesize_decision(ticker, date, list(debate_log))
             )
-            debate_log.append({"round": 2, "speaker": "Bear", "argument": bear_arg_2})
 
-        # Synthesize final recommendation
-        final_decision = await self._synthesize_decision(ticker, date, debate_log)
+            try:
+                bear_2 = await self._generate_bear_argument(
+                    ticker, date, context, [bull_1.argument, bear_1.argument, bull_2.argument]
+                )
+            except BaseException:
+                synth_task.cancel()
+                raise
+            debate_log.append({"round": 2, "speaker": "Bear", "argument": bear_2.argument})
+
+            # Keep the speculative decision unless the bear's rebuttal is
+            # more convincing than the bull's, in which case re-judge
+            if bear_2.conviction > bull_2.conviction:
+                synth_task.cancel()
+                final_decision = await self._synthesize_decision(ticker, date, debate_log)
+            else:
+                final_decision = await synth_task
 
         return {
             "agent": self.name,
@@ -75,22 +97,20 @@ class DebateTeam:
         self,
         ticker: str,
         date: str,
-        technical: Dict,
-        sentiment: Dict,
+        context: str,
         previous_arguments: List[str]
-    ) -> str:
+    ) -> DebateArgument:
         """Generate bullish argument"""
-        context = self._format_context(technical, sentiment)
         previous = "\n".join([f"- {arg}" for arg in previous_arguments[-2:]])
 
-        prompt = f"""You are the BULL advocate in a trading debate for {ticker} on {date}.
+        # Static per-debate prefix, identical across rounds. At ~250 tokens it's
+        # under Anthropic's prompt-caching minimum, so it's only cached once
+        # the market data grows past it (see system_blocks)
+        system = f"""You are the BULL advocate in a trading debate for {ticker} on {date}.
 
 MARKET DATA:
 {context}
 
-PREVIOUS ARGUMENTS:
-{previous if previous else "This is your opening argument."}
-
 Provide a BULLISH argument for why to BUY {ticker}. Focus on:
 1. Positive technical signals
 2. Favorable sentiment
@@ -101,38 +121,42 @@ Be specific, data-driven, and persuasive. Respond in JSON format with:
 - argument: Your main bullish case (string)
 - key_points: List of 3-5 supporting points
 - conviction: Your confidence level (0-1)
+"""
+
+        prompt = f"""PREVIOUS ARGUMENTS:
+{previous if previous else "This is your opening argument."}
 """
 
         # Call LLM (currently mocked)
         # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
-        response = await llm_client.call_claude(prompt, model=self.model, temperature=0.8)
+        response = await llm_client.call_claude(
+            prompt,
+            model=self.model,
+            temperature=0.8,
+            response_schema=DebateArgument,
+            system=system_blocks(system, self.model)
+        )
 
-        try:
-            result = json.loads(response)
-            return result.get('argument', 'Bull argument generated')
-        except:
-            return "Strong bullish signals based on technical and sentiment analysis"
+        return DebateArgument.model_validate_json(response)
 
     async def _generate_bear_argument(
         self,
         ticker: str,
         date: str,
-        technical: Dict,
-        sentiment: Dict,
+        context: str,
         previous_arguments: List[str]
-    ) -> str:
+    ) -> DebateArgument:
         """Generate bearish argument"""
-        context = self._format_context(technical, sentiment)
         previous = "\n".join([f"- {arg}" for arg in previous_arguments[-2:]])
 
-        prompt = f"""You are the BEAR advocate in a trading debate for {ticker} on {date}.
+        # Static per-debate prefix, identical across rounds. At ~250 tokens it's
+        # under Anthropic's prompt-caching minimum, so it's only cached once
+        # the market data grows past it (see system_blocks)
+        system = f"""You are the BEAR advocate in a trading debate for {ticker} on {date}.
 
 MARKET DATA:
 {context}
 
-PREVIOUS ARGUMENTS:
-{previous if previous else "This is your opening argument."}
-
 Provide a BEARISH argument for why to be cautious about {ticker}. Focus on:
 1. Concerning technical signals
 2. Negative sentiment indicators
@@ -143,17 +167,23 @@ Be specific, data-driven, and persuasive. Respond in JSON format with:
 - argument: Your main bearish case (string)
 - key_points: List of 3-5 supporting points
 - conviction: Your confidence level (0-1)
+"""
+
+        prompt = f"""PREVIOUS ARGUMENTS:
+{previous if previous else "This is your opening argument."}
 """
 
         # Call LLM (currently mocked)
         # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
-        response = await llm_client.call_claude(prompt, model=self.model, temperature=0.8)
+        response = await llm_client.call_claude(
+            prompt,
+            model=self.model,
+            temperature=0.8,
+            response_schema=DebateArgument,
+            system=system_blocks(system, self.model)
+        )
 
-        try:
-            result = json.loads(response)
-            return result.get('argument', 'Bear argument generated')
-        except:
-            return "Significant risk factors warrant caution on this position"
+        return DebateArgument.model_validate_json(response)
 
     async def _synthesize_decision(self, ticker: str, date: str, debate_log: List[Dict]) -> Dict[str, Any]:
         """Synthesize final decision from debate"""
@@ -178,19 +208,28 @@ Respond in JSON format with keys: winning_side, action, confidence, key_reasons
 
         # Call LLM (currently mocked)
         # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
-        response = await llm_client.call_claude(prompt, model=self.model, temperature=0.5)
-
-        try:
-            decision = json.loads(response)
-        except:
-            decision = {
-                "winning_side": "Bull",
-                "action": "HOLD",
-                "confidence": 0.6,
-                "key_reasons": ["Balanced arguments on both sides"]
-            }
-
-        return decision
+        response = await llm_client.call_claude(
+            prompt, model=self.model, temperature=0.5, response_schema=DebateDecision
+        )
+
+        return DebateDecision.model_validate_json(response).model_dump()
+
+    def _judge_by_conviction(self, bull: DebateArgument, bear: DebateArgument) -> Dict[str, Any]:
+        """Cheap heuristic judge: the side with higher conviction wins"""
+        margin = bull.conviction - bear.conviction
+        winner = bull if margin >= 0 else bear
+
+        if abs(margin) < 0.1:
+            action = "HOLD"
+        else:
+            action = "BUY" if margin > 0 else "SELL"
+
+        return DebateDecision(
+            winning_side="Bull" if margin >= 0 else "Bear",
+            action=action,
+            confidence=winner.conviction,
+            key_reasons=winner.key_points
+        ).model_dump()
 
     def _format_context(self, technical: Dict, sentiment: Dict) -> str:
         """Format analysis context for prompts"""
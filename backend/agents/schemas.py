@@ -0,0 +1,106 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
+
+# Structured output schemas for agent LLM calls.
+# Passed to llm_client as `response_schema` so the model is constrained to
+# emit exactly this shape (Claude tool-use / Gemini JSON mode). Each schema
+# carries one example, which mock mode returns verbatim.
+
+class TechnicalResult(BaseModel):
+    """Technical Analyst output"""
+    trend: Literal["BULLISH", "BEARISH", "NEUTRAL"]
+    signals: List[str]
+    momentum: str
+    recommendation: Literal["BUY", "SELL", "HOLD"]
+    confidence: float = Field(ge=0, le=1)
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "trend": "BULLISH",
+        "signals": ["Price above 20-day SMA", "RSI trending up without being overbought"],
+        "momentum": "POSITIVE",
+        "recommendation": "BUY",
+        "confidence": 0.75
+    }]})
+
+class SentimentResult(BaseModel):
+    """Sentiment Analyst output"""
+    sentiment_score: float = Field(ge=-1, le=1)
+    themes: List[str]
+    trend: Literal["IMPROVING", "DECLINING", "STABLE"]
+    impact: Literal["POSITIVE", "NEGATIVE", "NEUTRAL"]
+    confidence: float = Field(ge=0, le=1)
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "sentiment_score": 0.42,
+        "themes": ["earnings", "product launch", "market growth"],
+        "trend": "IMPROVING",
+        "impact": "POSITIVE",
+        "confidence": 0.7
+    }]})
+
+class DebateArgument(BaseModel):
+    """Bull or bear argument in a debate round"""
+    argument: str
+    key_points: List[str]
+    conviction: float = Field(ge=0, le=1)
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "argument": "Momentum and sentiment both support the position",
+        "key_points": [
+            "Momentum indicators",
+            "Market sentiment",
+            "Fundamentals"
+        ],
+        "conviction": 0.75
+    }]})
+
+class DebateDecision(BaseModel):
+    """Judge's synthesis of a debate"""
+    winning_side: Literal["Bull", "Bear"]
+    action: Literal["BUY", "SELL", "HOLD"]
+    confidence: float = Field(ge=0, le=1)
+    key_reasons: List[str]
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "winning_side": "Bull",
+        "action": "BUY",
+        "confidence": 0.7,
+        "key_reasons": ["Positive technical signals", "Favorable market sentiment"]
+    }]})
+
+class TradeDecision(BaseModel):
+    """Trader's final decision"""
+    action: Literal["BUY", "SELL", "HOLD"]
+    quantity: int = Field(ge=0)
+    reasoning: str
+    confidence: float = Field(ge=0, le=1)
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "action": "BUY",
+        "quantity": 10,
+        "reasoning": "Based on positive technical and sentiment analysis, bullish debate outcome",
+        "confidence": 0.78
+    }]})
+
+def _example(model: type) -> dict:
+    return model.model_config["json_schema_extra"]["examples"][0]
+
+class CompositeResult(BaseModel):
+    """Every analysis and debate stage for one (ticker, date) in a single reply"""
+    technical: TechnicalResult
+    sentiment: SentimentResult
+    bull_r1: DebateArgument
+    bear_r1: DebateArgument
+    bull_r2: Optional[DebateArgument] = None
+    bear_r2: Optional[DebateArgument] = None
+    synth: DebateDecision
+
+    model_config = ConfigDict(json_schema_extra={"examples": [{
+        "technical": _example(TechnicalResult),
+        "sentiment": _example(SentimentResult),
+        "bull_r1": _example(DebateArgument),
+        "bear_r1": _example(DebateArgument),
+        "bull_r2": _example(DebateArgument),
+        "bear_r2": _example(DebateArgument),
+        "synth": _example(DebateDecision)
+    }]})
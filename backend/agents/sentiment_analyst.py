@@ -1,7 +1,8 @@
-import json
-from typing import Dict, Any
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
 from services.llm_client import llm_client
 from services.data_loader import data_loader
+from .schemas import SentimentResult
 
 class SentimentAnalyst:
     """
@@ -10,6 +11,11 @@ class SentimentAnalyst:
     Uses Claude Haiku for cost efficiency
     """
 
+    __slots__ = ("name", "model")
+
+    # Reply fields, shared with CompositeAgent's prompt
+    RESPONSE_KEYS = "sentiment_score (-1 to 1), themes, trend (IMPROVING, DECLINING, STABLE), impact (POSITIVE, NEGATIVE, NEUTRAL), confidence (0-1)"
+
     def __init__(self):
         self.name = "Sentiment Analyst"
         self.model = "claude-haiku-20240307"
@@ -26,58 +32,96 @@ class SentimentAnalyst:
         Returns:
             Dict containing sentiment analysis results
         """
-        from datetime import datetime, timedelta
-
         # Load sentiment data
-        end_date = datetime.strptime(date, "%Y-%m-%d")
-        start_date = end_date - timedelta(days=lookback_days)
+        sentiment_data = self.load_sentiment(ticker, date, lookback_days)
 
-        sentiment_data = data_loader.load_sentiment_data(
-            ticker,
-            start_date.strftime("%Y-%m-%d"),
-            date
+        # Call LLM (currently mocked)
+        # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
+        prompt = self.build_prompt(ticker, date, sentiment_data, lookback_days)
+        response = await llm_client.call_claude(
+            prompt, model=self.model, temperature=0.3, response_schema=SentimentResult
+        )
+
+        return self._parse_response(response, sentiment_data)
+
+    async def analyze_batch(self, items: List[Tuple[str, str]], lookback_days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Perform sentiment analysis for many (ticker, date) pairs at once
+
+        All prompts are sent through a single concurrent LLM batch.
+
+        Args:
+            items: List of (ticker, date) pairs
+            lookback_days: Number of days to look back for sentiment
+
+        Returns:
+            List of sentiment analysis results, in the same order as items
+        """
+        if not items:
+            return []
+
+        sentiment_list = [
+            self.load_sentiment(ticker, date, lookback_days)
+            for ticker, date in items
+        ]
+        prompts = [
+            self.build_prompt(ticker, date, sentiment_data, lookback_days)
+            for (ticker, date), sentiment_data in zip(items, sentiment_list)
+        ]
+
+        responses = await llm_client.call_claude_batch(
+            prompts, model=self.model, temperature=0.3, response_schema=SentimentResult
         )
 
-        # Create prompt for LLM
-        prompt = f"""You are a sentiment analyst. Analyze social media sentiment for the following stock.
+        return [
+            self._parse_response(response, sentiment_data)
+            for response, sentiment_data in zip(responses, sentiment_list)
+        ]
+
+    def build_prompt(self, ticker: str, date: str, sentiment_data: Dict[str, Any], lookback_days: int = 7) -> str:
+        """Build the LLM prompt for a ticker/date from its sentiment data"""
+        return f"""You are a sentiment analyst. Analyze social media sentiment for the following stock.
 
 Ticker: {ticker}
 Date: {date}
 
-Sentiment Data (last {lookback_days} days):
+{self.format_data(sentiment_data, lookback_days)}
+
+Based on this sentiment analysis, provide:
+1. Overall sentiment score (-1 to 1)
+2. Key themes and topics
+3. Sentiment trend (IMPROVING, DECLINING, STABLE)
+4. Recommendation impact (POSITIVE, NEGATIVE, NEUTRAL)
+
+Respond in JSON format with keys: {self.RESPONSE_KEYS}
+"""
+
+    def format_data(self, sentiment_data: Dict[str, Any], lookback_days: int = 7) -> str:
+        """Format sentiment data (averages and sample posts) for a prompt"""
+        return f"""Sentiment Data (last {lookback_days} days):
 - Reddit Average Sentiment: {sentiment_data['reddit_avg_sentiment']:.3f}
 - Twitter Average Sentiment: {sentiment_data['twitter_avg_sentiment']:.3f}
 - Total Posts: {sentiment_data['total_posts']}
 
 Sample Reddit Posts:
-{self._format_posts(sentiment_data['reddit'][:5])}
+{self._format_posts(sentiment_data['reddit'])}
 
 Sample Tweets:
-{self._format_posts(sentiment_data['twitter'][:5])}
+{self._format_posts(sentiment_data['twitter'])}"""
 
-Based on this sentiment analysis, provide:
-1. Overall sentiment score (-1 to 1)
-2. Key themes and topics
-3. Sentiment trend (IMPROVING, DECLINING, STABLE)
-4. Recommendation impact (POSITIVE, NEGATIVE, NEUTRAL)
+    def load_sentiment(self, ticker: str, date: str, lookback_days: int) -> Dict[str, Any]:
+        """Load sentiment data for the lookback window ending on date"""
+        start_date = datetime.fromisoformat(date) - timedelta(days=lookback_days)
 
-Respond in JSON format with keys: sentiment_score, themes, trend, impact, confidence (0-1)
-"""
+        return data_loader.load_sentiment_data(
+            ticker,
+            start_date.date().isoformat(),
+            date
+        )
 
-        # Call LLM (currently mocked)
-        # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
-        response = await llm_client.call_claude(prompt, model=self.model, temperature=0.3)
-
-        try:
-            analysis = json.loads(response)
-        except json.JSONDecodeError:
-            analysis = {
-                "sentiment_score": 0.0,
-                "themes": ["Unable to parse LLM response"],
-                "trend": "STABLE",
-                "impact": "NEUTRAL",
-                "confidence": 0.5
-            }
+    def _parse_response(self, response: str, sentiment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the LLM response and attach raw sentiment data"""
+        analysis = SentimentResult.model_validate_json(response).model_dump()
 
         # Add raw sentiment data to response
         analysis['raw_data'] = {
@@ -89,18 +133,20 @@ Respond in JSON format with keys: sentiment_score, themes, trend, impact, confid
 
         return analysis
 
-    def _format_posts(self, posts: list) -> str:
-        """Format posts for prompt"""
-        if not posts:
+    def _format_posts(self, posts: Dict[str, list]) -> str:
+        """Format the first five posts (column-wise) for prompt"""
+        if not posts.get('sentiment'):
             return "No posts available"
 
+        sentiments = posts['sentiment'][:5]
         formatted = []
-        for i, post in enumerate(posts[:5], 1):
-            if 'title' in post:  # Reddit
-                formatted.append(f"{i}. {post['title']} (sentiment: {post['sentiment']:.2f})")
-            elif 'text' in post:  # Twitter
-                text = post['text'][:100] + "..." if len(post['text']) > 100 else post['text']
-                formatted.append(f"{i}. {text} (sentiment: {post['sentiment']:.2f})")
+        if 'title' in posts:  # Reddit
+            for i, (title, sentiment) in enumerate(zip(posts['title'], sentiments), 1):
+                formatted.append(f"{i}. {title} (sentiment: {sentiment:.2f})")
+        elif 'text' in posts:  # Twitter
+            for i, (text, sentiment) in enumerate(zip(posts['text'], sentiments), 1):
+                text = text[:100] + "..." if len(text) > 100 else text
+                formatted.append(f"{i}. {text} (sentiment: {sentiment:.2f})")
 
         return "\n".join(formatted)
 
@@ -1,7 +1,7 @@
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from services.llm_client import llm_client
 from services.data_loader import data_loader
+from .schemas import TechnicalResult
 
 class TechnicalAnalyst:
     """
@@ -10,6 +10,11 @@ class TechnicalAnalyst:
     Uses Claude Haiku for cost efficiency
     """
 
+    __slots__ = ("name", "model")
+
+    # Reply fields, shared with CompositeAgent's prompt
+    RESPONSE_KEYS = "trend (BULLISH, BEARISH, NEUTRAL), signals, momentum, recommendation (BUY, SELL, HOLD), confidence (0-1)"
+
     def __init__(self):
         self.name = "Technical Analyst"
         self.model = "claude-haiku-20240307"
@@ -21,38 +26,66 @@ class TechnicalAnalyst:
         Args:
             ticker: Stock ticker symbol
             date: Analysis date
-            lookback_days: Number of days to look back for analysis
+            lookback_days: Minimum days of price history behind the indicators
 
         Returns:
             Dict containing technical analysis results
         """
-        from datetime import datetime, timedelta
+        # Look up precomputed technical indicators
+        indicators = data_loader.indicators_for(ticker, date, lookback_days)
+
+        # Call LLM (currently mocked)
+        # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
+        prompt = self.build_prompt(ticker, date, indicators)
+        response = await llm_client.call_claude(
+            prompt, model=self.model, temperature=0.3, response_schema=TechnicalResult
+        )
+
+        return self._parse_response(response, indicators)
+
+    async def analyze_batch(self, items: List[Tuple[str, str]], lookback_days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Perform technical analysis for many (ticker, date) pairs at once
 
-        # Load market data
-        end_date = datetime.strptime(date, "%Y-%m-%d")
-        start_date = end_date - timedelta(days=lookback_days)
+        Indicators come from the per-ticker precomputed table and all
+        prompts are sent through a single concurrent LLM batch.
 
-        market_data = data_loader.load_market_data(
-            ticker,
-            start_date.strftime("%Y-%m-%d"),
-            date
+        Args:
+            items: List of (ticker, date) pairs
+            lookback_days: Minimum days of price history behind the indicators
+
+        Returns:
+            List of technical analysis results, in the same order as items
+        """
+        if not items:
+            return []
+
+        indicators_list = [
+            data_loader.indicators_for(ticker, date, lookback_days)
+            for ticker, date in items
+        ]
+        prompts = [
+            self.build_prompt(ticker, date, indicators)
+            for (ticker, date), indicators in zip(items, indicators_list)
+        ]
+
+        responses = await llm_client.call_claude_batch(
+            prompts, model=self.model, temperature=0.3, response_schema=TechnicalResult
         )
 
-        # Calculate technical indicators
-        indicators = data_loader.calculate_technical_indicators(market_data)
+        return [
+            self._parse_response(response, indicators)
+            for response, indicators in zip(responses, indicators_list)
+        ]
 
-        # Create prompt for LLM
-        prompt = f"""You are a technical analyst. Analyze the following stock data and provide insights.
+    def build_prompt(self, ticker: str, date: str, indicators: Dict[str, Any]) -> str:
+        """Build the LLM prompt for a ticker/date from its indicators"""
+        return f"""You are a technical analyst. Analyze the following stock data and provide insights.
 
 Ticker: {ticker}
 Date: {date}
 
-Technical Indicators:
-- Current Price: ${indicators['current_price']:.2f}
-- 20-day SMA: ${indicators['sma_20']:.2f}
-- 50-day SMA: ${indicators['sma_50']:.2f}
-- RSI: {indicators['rsi']:.2f}
-- Volume: {indicators['volume']:,}
+{self.format_indicators(indicators)}
 
 Based on this technical analysis, provide:
 1. Overall trend (BULLISH, BEARISH, or NEUTRAL)
@@ -60,24 +93,21 @@ Based on this technical analysis, provide:
 3. Price momentum assessment
 4. Recommendation (BUY, SELL, or HOLD)
 
-Respond in JSON format with keys: trend, signals, momentum, recommendation, confidence (0-1)
+Respond in JSON format with keys: {self.RESPONSE_KEYS}
 """
 
-        # Call LLM (currently mocked)
-        # TO MAKE FUNCTIONAL: Ensure llm_client.call_claude makes real API calls
-        response = await llm_client.call_claude(prompt, model=self.model, temperature=0.3)
-
-        try:
-            analysis = json.loads(response)
-        except json.JSONDecodeError:
-            # Fallback if response is not JSON
-            analysis = {
-                "trend": "NEUTRAL",
-                "signals": ["Unable to parse LLM response"],
-                "momentum": "NEUTRAL",
-                "recommendation": "HOLD",
-                "confidence": 0.5
-            }
+    def format_indicators(self, indicators: Dict[str, Any]) -> str:
+        """Format technical indicators for a prompt"""
+        return f"""Technical Indicators:
+- Current Price: ${indicators['current_price']:.2f}
+- 20-day SMA: ${indicators['sma_20']:.2f}
+- 50-day SMA: ${indicators['sma_50']:.2f}
+- RSI: {indicators['rsi']:.2f}
+- Volume: {indicators['volume']:,}"""
+
+    def _parse_response(self, response: str, indicators: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the LLM response and attach raw indicators"""
+        analysis = TechnicalResult.model_validate_json(response).model_dump()
 
         # Add raw indicators to response
         analysis['indicators'] = indicators
@@ -1,6 +1,26 @@
-import json
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Dict, Any, List, Optional
 from services.llm_client import llm_client
+from .schemas import TradeDecision
+
+# Trade log row layout (one contiguous record per trade). Text fields are
+# fixed-width, so values that don't fit are rejected rather than truncated.
+TRADE_DTYPE = np.dtype([
+    ("date", "U32"),  # ISO date or datetime
+    ("ticker", "U16"),  # Room for suffixed symbols, e.g. "RELIANCE.NS"
+    ("action", "U4"),
+    ("quantity", "i4"),
+    ("price", "f8"),
+    ("cost", "f8"),
+    ("cash_after", "f8")
+])
+
+def _check_trade_fields(ticker: str, date: str) -> None:
+    """Raise ValueError if ticker or date wouldn't fit the trade log"""
+    for field, value in (("ticker", ticker), ("date", date)):
+        width = TRADE_DTYPE.fields[field][0].itemsize // 4
+        if len(value) > width:
+            raise ValueError(f"{field} {value!r} is longer than {width} characters")
 
 class Trader:
     """
@@ -9,21 +29,36 @@ class Trader:
     Can use different LLM models (Claude, Gemini) for comparison
     """
 
-    def __init__(self, model_type: str = "claude", name: Optional[str] = None):
+    __slots__ = (
+        "model_type", "name", "cash", "holdings",
+        "_trades", "_n", "_last_prices", "_market_value"
+    )
+
+    def __init__(self, model_type: str = "claude", name: Optional[str] = None, initial_cash: float = 10000.0):
         """
         Initialize trader with specific LLM model
 
         Args:
             model_type: One of "claude", "gemini"
             name: Custom name for the trader (defaults to model type)
+            initial_cash: Starting cash balance
         """
         self.model_type = model_type
         self.name = name or f"{model_type.upper()} Trader"
+        self.reset(initial_cash)
 
+    def reset(self, initial_cash: float = 10000.0) -> None:
+        """Clear the portfolio and trade log, starting over with initial_cash"""
         # Portfolio tracking
-        self.cash = 10000.0
+        self.cash = initial_cash
         self.holdings: Dict[str, int] = {}  # {ticker: quantity}
-        self.trade_history: List[Dict] = []
+        self._trades = np.zeros(64, dtype=TRADE_DTYPE)  # Trade log, grown by doubling
+        self._n = 0  # Number of trades logged
+
+        # Holdings valued at the last known price per ticker, kept up to date
+        # incrementally so portfolio value is O(1)
+        self._last_prices: Dict[str, float] = {}
+        self._market_value = 0.0
 
     async def make_decision(
         self,
@@ -48,6 +83,9 @@ class Trader:
         Returns:
             Dict containing trading decision
         """
+        # Fail before spending an LLM call on a trade that can't be logged
+        _check_trade_fields(ticker, date)
+
         # Format all analysis for the LLM
         context = self._format_trading_context(
             ticker, date, current_price,
@@ -55,8 +93,9 @@ class Trader:
         )
 
         # Add portfolio context
+        self._reprice(ticker, current_price)
         current_position = self.holdings.get(ticker, 0)
-        portfolio_value = self.get_portfolio_value({ticker: current_price})
+        portfolio_value = self.get_portfolio_value()
 
         prompt = f"""You are an expert trader making a decision for {ticker} on {date}.
 
@@ -86,21 +125,13 @@ Respond in JSON format with keys: action, quantity, reasoning, confidence
         # Call appropriate LLM based on model_type
         # TO MAKE FUNCTIONAL: Ensure these make real API calls (see llm_client.py)
         if self.model_type == "claude":
-            response = await llm_client.call_claude(prompt, temperature=0.7)
+            response = await llm_client.call_claude(prompt, temperature=0.7, response_schema=TradeDecision)
         elif self.model_type == "gemini":
-            response = await llm_client.call_gemini(prompt, temperature=0.7)
+            response = await llm_client.call_gemini(prompt, temperature=0.7, response_schema=TradeDecision)
         else:
-            response = json.dumps({"action": "HOLD", "quantity": 0, "reasoning": "Unknown model", "confidence": 0.5})
-
-        try:
-            decision = json.loads(response)
-        except:
-            decision = {
-                "action": "HOLD",
-                "quantity": 0,
-                "reasoning": "Unable to parse LLM response",
-                "confidence": 0.5
-            }
+            response = TradeDecision(action="HOLD", quantity=0, reasoning="Unknown model", confidence=0.5).model_dump_json()
+
+        decision = TradeDecision.model_validate_json(response).model_dump()
 
         # Validate and execute decision
         executed_decision = self._execute_trade(
@@ -129,10 +160,15 @@ Respond in JSON format with keys: action, quantity, reasoning, confidence
         quantity: int
     ) -> Dict[str, Any]:
         """Execute a trade and update portfolio"""
+        _check_trade_fields(ticker, date)
+
         actual_action = action
         actual_quantity = 0
         cost = 0.0
 
+        self._reprice(ticker, price)
+        old_quantity = self.holdings.get(ticker, 0)
+
         if action == "BUY" and quantity > 0:
             cost = price * quantity
             if cost <= self.cash:
@@ -162,17 +198,15 @@ Respond in JSON format with keys: action, quantity, reasoning, confidence
             else:
                 actual_action = "HOLD"
 
+        self._market_value += (self.holdings.get(ticker, 0) - old_quantity) * price
+
         # Log trade
-        trade = {
-            "date": date,
-            "ticker": ticker,
-            "action": actual_action,
-            "quantity": actual_quantity,
-            "price": price,
-            "cost": cost,
-            "cash_after": self.cash
-        }
-        self.trade_history.append(trade)
+        if self._n == len(self._trades):
+            grown = np.zeros(2 * len(self._trades), dtype=TRADE_DTYPE)
+            grown[:self._n] = self._trades
+            self._trades = grown
+        self._trades[self._n] = (date, ticker, actual_action, actual_quantity, price, cost, self.cash)
+        self._n += 1
 
         return {
             "action": actual_action,
@@ -191,6 +225,7 @@ Respond in JSON format with keys: action, quantity, reasoning, confidence
         debate: Dict
     ) -> str:
         """Format all analysis into readable context"""
+        final_decision = debate.get('final_decision', {})
         return f"""
 Current Price: ${price:.2f}
 
@@ -205,28 +240,72 @@ Sentiment Analysis:
 - Impact: {sentiment.get('impact', 'N/A')}
 
 Debate Outcome:
-- Winning Side: {debate.get('final_decision', {}).get('winning_side', 'N/A')}
-- Recommended Action: {debate.get('final_decision', {}).get('action', 'N/A')}
-- Debate Confidence: {debate.get('final_decision', {}).get('confidence', 'N/A')}
-- Key Reasons: {', '.join(debate.get('final_decision', {}).get('key_reasons', []))}
+- Winning Side: {final_decision.get('winning_side', 'N/A')}
+- Recommended Action: {final_decision.get('action', 'N/A')}
+- Debate Confidence: {final_decision.get('confidence', 'N/A')}
+- Key Reasons: {', '.join(final_decision.get('key_reasons', []))}
 """
 
-    def get_portfolio_value(self, current_prices: Dict[str, float]) -> float:
-        """Calculate total portfolio value"""
+    @property
+    def trades(self) -> np.ndarray:
+        """Logged trades as a structured array view (one row per trade)"""
+        return self._trades[:self._n]
+
+    @property
+    def trade_history(self) -> List[Dict[str, Any]]:
+        """Logged trades as a list of dicts, for JSON responses"""
+        names = TRADE_DTYPE.names
+        return [dict(zip(names, row)) for row in self.trades.tolist()]
+
+    @property
+    def win_rate(self) -> float:
+        """Share of logged trades with negative cost (sell proceeds)"""
+        if self._n == 0:
+            return 0.0
+        return float((self.trades["cost"] < 0).mean())
+
+    def _reprice(self, ticker: str, price: float) -> None:
+        """Revalue a single ticker's position at a new price"""
+        last_price = self._last_prices.get(ticker, price)
+        self._market_value += self.holdings.get(ticker, 0) * (price - last_price)
+        self._last_prices[ticker] = price
+
+    def mark_to_market(self, prices: Dict[str, float]) -> None:
+        """Revalue all holdings at the given prices"""
+        self._last_prices.update(prices)
+        self._market_value = sum(
+            qty * self._last_prices.get(ticker, 0)
+            for ticker, qty in self.holdings.items()
+        )
+
+    def get_portfolio_value(self, current_prices: Optional[Dict[str, float]] = None) -> float:
+        """
+        Calculate total portfolio value
+
+        Without current_prices, holdings are valued at their last known
+        prices in O(1). With current_prices, the value is recomputed from
+        scratch using only those prices.
+        """
+        if current_prices is None:
+            return self.cash + self._market_value
+
         holdings_value = sum(
             qty * current_prices.get(ticker, 0)
             for ticker, qty in self.holdings.items()
         )
         return self.cash + holdings_value
 
-    def get_portfolio_summary(self, current_prices: Dict[str, float]) -> Dict[str, Any]:
-        """Get current portfolio summary"""
+    def get_portfolio_summary(self, current_prices: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Get current portfolio summary, marking holdings to current_prices if given"""
+        if current_prices is not None:
+            self.mark_to_market(current_prices)
+
         return {
             "agent": self.name,
             "cash": self.cash,
             "holdings": dict(self.holdings),
-            "portfolio_value": self.get_portfolio_value(current_prices),
-            "total_trades": len(self.trade_history),
+            "portfolio_value": self.get_portfolio_value(),
+            "total_trades": self._n,
             "trade_history": self.trade_history
         }
 
@@ -1,6 +1,6 @@
-from pydantic_settings import BaseSettings
-from functools import lru_cache
-from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property, lru_cache
+from typing import List, Optional, Tuple
 
 class Settings(BaseSettings):
     # API Keys - NEVER COMMIT THESE TO GIT!
@@ -15,16 +15,46 @@ class Settings(BaseSettings):
     start_date: str = "2020-07-01"
     end_date: str = "2020-09-30"
     tickers: str = "AAPL,MSFT"
+    analysis_batch_days: int = 5  # Days of analyst calls batched together
+    indicator_history_days: int = 90  # Warm-up history before start_date for indicators
+    compose_agents: bool = True  # Run analysts + debate as one LLM call per day in simulations
+    analysis_prefetch_depth: int = 1  # Days (or day-slices) analyzed ahead of the current one
+    simulation_log_path: str = "simulation_decisions.jsonl"  # Daily decisions, one JSON object per line
 
     # Model Selection
     analyst_model: str = "claude-haiku"
     debate_model: str = "claude-sonnet-4"
     trader_model: str = "claude-sonnet-4"
 
-    class Config:
-        env_file = ".env"
+    # Server Config
+    # Simulation status/results live in process memory, so keep 1 worker
+    # unless clients are pinned to a worker
+    api_workers: int = 1
 
-    def get_tickers_list(self) -> List[str]:
+    # CORS - override in prod with a JSON list, e.g. CORS_ORIGINS='["https://arena.example.com"]'
+    cors_origins: Tuple[str, ...] = ("http://localhost:3000", "http://localhost:3001")  # Frontend URLs
+    cors_max_age: int = 86400  # Seconds browsers may cache preflight responses
+
+    # LLM Response Cache
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = ".llm_cache.sqlite"
+    llm_cache_ttl: Optional[float] = None  # seconds, None = never expire
+    llm_cache_memory_entries: int = 10000  # Responses kept in memory (LRU); the rest stay on disk
+
+    # LLM Token Budget
+    max_prompt_tokens: int = 60000
+
+    # LLM Connection Pool
+    llm_max_connections: int = 200
+    llm_max_keepalive_connections: int = 100
+    claude_max_concurrency: int = 8  # Max in-flight Claude requests
+    gemini_max_concurrency: int = 4  # Max in-flight Gemini requests
+
+    # Frozen so the (cached) instance is immutable and hashable
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
+
+    @cached_property
+    def tickers_list(self) -> List[str]:
         return [t.strip() for t in self.tickers.split(",")]
 
 @lru_cache()
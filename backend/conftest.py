@@ -0,0 +1 @@
+# Lets tests import backend modules (services, agents, ...) the way main.py does
@@ -1,25 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from routers import agents, simulation
 from config import get_settings
+from services.llm_client import llm_client
+from services.tokens import load_encoding, start_usage
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the token encoding in the background; release the shared LLM connection pool on shutdown"""
+    encoding_task = asyncio.create_task(load_encoding())
+    yield
+    encoding_task.cancel()
+    await llm_client.aclose()
+
 app = FastAPI(
     title="LLM Trading Arena API",
     description="Multi-agent AI trading system with debate mechanism",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:3001"],  # Frontend URLs
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type", "authorization"],
+    expose_headers=["X-LLM-Cost-USD"],
+    max_age=settings.cors_max_age,
 )
 
+@app.middleware("http")
+async def llm_cost_header(request: Request, call_next):
+    """Report the estimated LLM cost of each request in X-LLM-Cost-USD"""
+    usage = start_usage()
+    response = await call_next(request)
+    response.headers["X-LLM-Cost-USD"] = f"{usage['cost_usd']:.6f}"
+    return response
+
+# Compress large JSON payloads (debate transcripts, simulation results)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
 app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
@@ -41,4 +71,11 @@ async def health():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=settings.api_workers,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop has no Windows build
+        http="httptools"
+    )
@@ -1,20 +1,43 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from functools import lru_cache, partial
+from typing import Dict, Any, Tuple
 from agents import TechnicalAnalyst, SentimentAnalyst, DebateTeam, Trader
+from config import get_settings
+from services.llm_client import CACHE_ENABLED
+from routers.route_class import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
-# Initialize agents
-technical_analyst = TechnicalAnalyst()
-sentiment_analyst = SentimentAnalyst()
-debate_team = DebateTeam()
+# Dependencies - analysts are stateless, so one shared instance each is enough
+@lru_cache()
+def get_technical_analyst() -> TechnicalAnalyst:
+    return TechnicalAnalyst()
 
-# Initialize traders with different models (Claude and Gemini only)
-claude_trader = Trader(model_type="claude", name="Claude Trader")
-gemini_trader = Trader(model_type="gemini", name="Gemini Trader")
+@lru_cache()
+def get_sentiment_analyst() -> SentimentAnalyst:
+    return SentimentAnalyst()
+
+@lru_cache()
+def get_debate_team() -> DebateTeam:
+    return DebateTeam()
+
+@lru_cache()
+def get_traders() -> Dict[str, Trader]:
+    # Initialize traders with different models (Claude and Gemini only)
+    initial_cash = get_settings().initial_capital
+    return {
+        "claude": Trader(model_type="claude", name="Claude Trader", initial_cash=initial_cash),
+        "gemini": Trader(model_type="gemini", name="Gemini Trader", initial_cash=initial_cash)
+    }
 
 @router.get("/status")
-async def get_agents_status():
+async def get_agents_status(
+    technical_analyst: TechnicalAnalyst = Depends(get_technical_analyst),
+    sentiment_analyst: SentimentAnalyst = Depends(get_sentiment_analyst),
+    debate_team: DebateTeam = Depends(get_debate_team),
+    traders: Dict[str, Trader] = Depends(get_traders)
+):
     """
     Get status of all agents
 
@@ -27,13 +50,17 @@ async def get_agents_status():
         ],
         "debate_team": debate_team.get_status(),
         "traders": [
-            claude_trader.get_status(),
-            gemini_trader.get_status()
+            traders["claude"].get_status(),
+            traders["gemini"].get_status()
         ]
     }
 
 @router.get("/technical/{ticker}")
-async def get_technical_analysis(ticker: str, date: str = "2020-07-15"):
+async def get_technical_analysis(
+    ticker: str,
+    date: str = "2020-07-15",
+    technical_analyst: TechnicalAnalyst = Depends(get_technical_analyst)
+):
     """
     Get technical analysis for a ticker
 
@@ -50,7 +77,11 @@ async def get_technical_analysis(ticker: str, date: str = "2020-07-15"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sentiment/{ticker}")
-async def get_sentiment_analysis(ticker: str, date: str = "2020-07-15"):
+async def get_sentiment_analysis(
+    ticker: str,
+    date: str = "2020-07-15",
+    sentiment_analyst: SentimentAnalyst = Depends(get_sentiment_analyst)
+):
     """
     Get sentiment analysis for a ticker
 
@@ -66,11 +97,51 @@ async def get_sentiment_analysis(ticker: str, date: str = "2020-07-15"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _run_debate(
+    ticker: str,
+    date: str,
+    rounds: int,
+    technical_analyst: TechnicalAnalyst,
+    sentiment_analyst: SentimentAnalyst,
+    debate_team: DebateTeam
+) -> Dict[str, Any]:
+    """Run both analyses and the debate for a ticker and date"""
+    # Get analysis first (independent, so run concurrently)
+    technical, sentiment = await asyncio.gather(
+        technical_analyst.analyze(ticker, date),
+        sentiment_analyst.analyze(ticker, date)
+    )
+
+    # Conduct debate
+    debate = await debate_team.conduct_debate(
+        ticker, date, technical, sentiment, rounds
+    )
+
+    return {
+        "technical_analysis": technical,
+        "sentiment_analysis": sentiment,
+        "debate": debate
+    }
+
+def _finish_warmup(key: Tuple[str, str, int], task: asyncio.Task) -> None:
+    if _warmup_tasks.get(key) is task:
+        del _warmup_tasks[key]
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Debate precompute error: {task.exception()}")
+
+# Background cache-warming jobs by (ticker, date, rounds), kept referenced
+# until they finish
+_warmup_tasks: Dict[Tuple[str, str, int], asyncio.Task] = {}
+
 @router.post("/debate")
 async def conduct_debate(
     ticker: str,
     date: str = "2020-07-15",
-    rounds: int = 2
+    rounds: int = 2,
+    precompute: bool = False,
+    technical_analyst: TechnicalAnalyst = Depends(get_technical_analyst),
+    sentiment_analyst: SentimentAnalyst = Depends(get_sentiment_analyst),
+    debate_team: DebateTeam = Depends(get_debate_team)
 ):
     """
     Conduct a trading debate for a ticker
@@ -81,27 +152,43 @@ async def conduct_debate(
         ticker: Stock ticker (e.g., AAPL, MSFT)
         date: Analysis date (YYYY-MM-DD)
         rounds: Number of debate rounds (1-3)
+        precompute: Return immediately and run the debate in the background
+            to warm the LLM cache, so the next identical request is a cache hit.
+            Skipped when the response cache is disabled (e.g. mock mode); at
+            most one precompute runs per (ticker, date, rounds)
     """
-    try:
-        # Get analysis first
-        technical = await technical_analyst.analyze(ticker, date)
-        sentiment = await sentiment_analyst.analyze(ticker, date)
+    key = (ticker, date, rounds)
+    warmup = _warmup_tasks.get(key)
+
+    if precompute:
+        if not CACHE_ENABLED:
+            # Nothing would be cached, so the work would be wasted
+            return {"message": "Debate precompute skipped (response cache disabled)", "ticker": ticker, "date": date}
+        if warmup is not None:
+            return {"message": "Debate precompute already running", "ticker": ticker, "date": date}
+
+        task = asyncio.create_task(_run_debate(
+            ticker, date, rounds, technical_analyst, sentiment_analyst, debate_team
+        ))
+        _warmup_tasks[key] = task
+        task.add_done_callback(partial(_finish_warmup, key))
+        return {"message": "Debate precompute started", "ticker": ticker, "date": date}
 
-        # Conduct debate
-        debate = await debate_team.conduct_debate(
-            ticker, date, technical, sentiment, rounds
+    try:
+        if warmup is not None:
+            # Share the in-flight precompute instead of repeating its LLM calls
+            return await asyncio.shield(warmup)
+        return await _run_debate(
+            ticker, date, rounds, technical_analyst, sentiment_analyst, debate_team
         )
-
-        return {
-            "technical_analysis": technical,
-            "sentiment_analysis": sentiment,
-            "debate": debate
-        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/portfolio/{trader_name}")
-async def get_portfolio(trader_name: str):
+async def get_portfolio(
+    trader_name: str,
+    traders: Dict[str, Trader] = Depends(get_traders)
+):
     """
     Get portfolio summary for a specific trader
 
@@ -110,12 +197,7 @@ async def get_portfolio(trader_name: str):
     Args:
         trader_name: One of "claude", "gemini"
     """
-    trader_map = {
-        "claude": claude_trader,
-        "gemini": gemini_trader
-    }
-
-    trader = trader_map.get(trader_name.lower())
+    trader = traders.get(trader_name.lower())
     if not trader:
         raise HTTPException(status_code=404, detail="Trader not found")
 
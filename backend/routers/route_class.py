@@ -0,0 +1,25 @@
+import orjson
+from fastapi import Request
+from fastapi.routing import APIRoute
+from typing import Any, Callable, Coroutine
+from starlette.responses import Response
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson instead of stdlib json"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """APIRoute that hands handlers an ORJSONRequest"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            request = ORJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return custom_route_handler
@@ -1,16 +1,43 @@
+import asyncio
+import orjson
+import pandas as pd
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Any, List
-from datetime import datetime, timedelta
-from agents import TechnicalAnalyst, SentimentAnalyst, DebateTeam, Trader
+from agents import Trader, CompositeAgent
 from services.data_loader import data_loader
-import json
+from config import get_settings
+from routers.agents import get_technical_analyst, get_sentiment_analyst, get_debate_team
+from routers.route_class import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
+settings = get_settings()
 
-# Store simulation results
+# Store simulation results. Each dict is replaced wholesale (never mutated
+# once published), so readers always see a consistent snapshot.
 simulation_results: Dict[str, Any] = {}
+simulation_summary: Dict[str, Any] = {}
 simulation_status: Dict[str, str] = {"status": "idle", "progress": 0}
 
+# Runs share the trader instances below, so they execute one at a time
+_run_lock = asyncio.Lock()
+
+# Agents are built once and reused across runs; only trader portfolios are
+# reset per run
+@lru_cache()
+def get_composite_agent() -> CompositeAgent:
+    return CompositeAgent(get_technical_analyst(), get_sentiment_analyst(), get_debate_team())
+
+@lru_cache()
+def get_simulation_traders() -> List[Trader]:
+    # Claude and Gemini only
+    return [
+        Trader(model_type="claude", name="Claude Trader"),
+        Trader(model_type="gemini", name="Gemini Trader")
+    ]
+
 @router.post("/run")
 async def run_simulation(
     background_tasks: BackgroundTasks,
@@ -31,7 +58,17 @@ async def run_simulation(
         start_date: Simulation start date
         end_date: Simulation end date
         debate_rounds: Number of debate rounds per decision
+
+    Returns 409 while another simulation is queued or running.
     """
+    global simulation_status
+
+    # Runs share the traders, so only one at a time. Checked and marked
+    # before any await, so concurrent requests can't both get through.
+    if simulation_status["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="A simulation is already running")
+    simulation_status = {"status": "queued", "progress": 0}
+
     # Start simulation in background
     background_tasks.add_task(
         _run_simulation_task,
@@ -70,6 +107,20 @@ async def get_simulation_results():
 
     return simulation_results
 
+@router.get("/results/decisions")
+async def get_simulation_decisions():
+    """
+    Get the daily decisions of the last simulation
+
+    Streamed from disk as JSON Lines (one day's analysis, debate and trader
+    decisions per line)
+    """
+    path = Path(settings.simulation_log_path)
+    if not simulation_results or not path.exists():
+        return {"message": "No simulation results available. Run /simulation/run first"}
+
+    return FileResponse(path, media_type="application/x-ndjson")
+
 @router.get("/results/summary")
 async def get_results_summary():
     """
@@ -77,22 +128,24 @@ async def get_results_summary():
 
     **API Integration Point**: Call from frontend for performance charts
     """
-    if not simulation_results:
+    if not simulation_summary:
         return {"message": "No results available"}
 
-    traders = simulation_results.get("traders", [])
+    return simulation_summary
 
+def _build_summary(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize simulation results for the performance charts"""
     summary = {
-        "ticker": simulation_results.get("ticker"),
+        "ticker": results.get("ticker"),
         "period": {
-            "start": simulation_results.get("start_date"),
-            "end": simulation_results.get("end_date"),
-            "days": simulation_results.get("total_days")
+            "start": results.get("start_date"),
+            "end": results.get("end_date"),
+            "days": results.get("total_days")
         },
         "traders": []
     }
 
-    for trader in traders:
+    for trader in results.get("traders", []):
         summary["traders"].append({
             "name": trader["name"],
             "model": trader["model"],
@@ -100,19 +153,11 @@ async def get_results_summary():
             "total_return": trader["total_return"],
             "total_return_pct": trader["total_return_pct"],
             "total_trades": trader["total_trades"],
-            "win_rate": _calculate_win_rate(trader["trades"])
+            "win_rate": trader["win_rate"]
         })
 
     return summary
 
-def _calculate_win_rate(trades: List[Dict]) -> float:
-    """Calculate win rate from trades"""
-    if not trades:
-        return 0.0
-
-    profitable = sum(1 for t in trades if t.get("cost", 0) < 0)  # Negative cost = profit from sell
-    return profitable / len(trades) if trades else 0.0
-
 async def _run_simulation_task(
     ticker: str,
     start_date: str,
@@ -120,72 +165,131 @@ async def _run_simulation_task(
     debate_rounds: int
 ):
     """Background task to run simulation"""
-    global simulation_results, simulation_status
+    async with _run_lock:
+        await _run_simulation(ticker, start_date, end_date, debate_rounds)
+
+async def _run_simulation(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    debate_rounds: int
+):
+    global simulation_results, simulation_summary, simulation_status
 
     try:
         simulation_status = {"status": "running", "progress": 0}
 
-        # Initialize agents
-        technical = TechnicalAnalyst()
-        sentiment = SentimentAnalyst()
-        debate = DebateTeam()
-
-        # Initialize traders (Claude and Gemini only)
-        traders = [
-            Trader(model_type="claude", name="Claude Trader"),
-            Trader(model_type="gemini", name="Gemini Trader")
-        ]
-
-        # Generate trading dates
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        trading_dates = []
-
-        current = start
-        while current <= end:
-            # Skip weekends
-            if current.weekday() < 5:
-                trading_dates.append(current.strftime("%Y-%m-%d"))
-            current += timedelta(days=1)
+        technical = get_technical_analyst()
+        sentiment = get_sentiment_analyst()
+        debate = get_debate_team()
+        composite = get_composite_agent()
 
-        total_days = len(trading_dates)
-        all_decisions = []
+        traders = get_simulation_traders()
+        for trader in traders:
+            trader.reset()
 
-        # Run simulation for each day
-        for idx, date in enumerate(trading_dates):
-            simulation_status["progress"] = int((idx / total_days) * 100)
+        # Generate trading dates (weekdays only)
+        trading_dates = pd.bdate_range(start_date, end_date).strftime("%Y-%m-%d").tolist()
 
-            # Get current price
-            current_price = data_loader.get_latest_price(ticker, date)
+        total_days = len(trading_dates)
 
-            # Run analysis
-            tech_analysis = await technical.analyze(ticker, date)
-            sent_analysis = await sentiment.analyze(ticker, date)
-            debate_result = await debate.conduct_debate(
-                ticker, date, tech_analysis, sent_analysis, debate_rounds
+        # Load the whole period's prices and indicators once
+        price_map = data_loader.load_price_map(ticker, start_date, end_date)
+        data_loader.prefetch_window(ticker, start_date, end_date)
+
+        # Analysis runs in units: one day when composing, else one day-slice
+        # (one batched LLM call per analyst). Units don't depend on trader
+        # decisions, so the next ones are started while the current day's
+        # debate and traders run.
+        step = 1 if settings.compose_agents else max(1, settings.analysis_batch_days)
+        depth = max(0, settings.analysis_prefetch_depth)
+        pending: Dict[int, asyncio.Task] = {}
+
+        async def analyze_unit(start: int) -> List[tuple]:
+            if settings.compose_agents:
+                return [await composite.run(ticker, trading_dates[start], debate_rounds)]
+
+            items = [(ticker, d) for d in trading_dates[start:start + step]]
+            tech_batch, sent_batch = await asyncio.gather(
+                technical.analyze_batch(items),
+                sentiment.analyze_batch(items)
             )
-
-            # Each trader makes decision
-            day_decisions = {
-                "date": date,
-                "price": current_price,
-                "technical": tech_analysis,
-                "sentiment": sent_analysis,
-                "debate": debate_result,
-                "trader_decisions": []
-            }
-
-            for trader in traders:
-                decision = await trader.make_decision(
-                    ticker, date, current_price,
-                    tech_analysis, sent_analysis, debate_result
-                )
-                day_decisions["trader_decisions"].append(decision)
-
-            all_decisions.append(day_decisions)
+            return list(zip(tech_batch, sent_batch))
+
+        unit: List[tuple] = []
+
+        # Daily decisions go straight to disk rather than accumulating in
+        # memory. They're written to a temp file that replaces the published
+        # log only once the run completes, so the log always matches results.
+        log_path = Path(settings.simulation_log_path)
+        tmp_log_path = log_path.with_name(log_path.name + ".tmp")
+
+        try:
+            with open(tmp_log_path, "wb") as decision_log:
+                # Run simulation for each day
+                for idx, date in enumerate(trading_dates):
+                    # Publish progress only when the percentage changes
+                    progress = int((idx / total_days) * 100)
+                    if progress != simulation_status["progress"]:
+                        simulation_status = {"status": "running", "progress": progress}
+
+                    # Get current price
+                    current_price = price_map.get(date)
+                    if current_price is None:
+                        current_price = data_loader.get_latest_price(ticker, date)
+
+                    if idx % step == 0:
+                        # Keep at most `depth` units in flight ahead of this one
+                        for start in range(idx, min(idx + (depth + 1) * step, total_days), step):
+                            if start not in pending:
+                                pending[start] = asyncio.create_task(analyze_unit(start))
+                        unit = await pending.pop(idx)
+
+                    if settings.compose_agents:
+                        # Analysts and debate folded into a single LLM call
+                        tech_analysis, sent_analysis, debate_result = unit[0]
+                    else:
+                        tech_analysis, sent_analysis = unit[idx % step]
+                        debate_result = await debate.conduct_debate(
+                            ticker, date, tech_analysis, sent_analysis, debate_rounds
+                        )
+
+                    # Each trader makes decision
+                    day_decisions = {
+                        "date": date,
+                        "price": current_price,
+                        "technical": tech_analysis,
+                        "sentiment": sent_analysis,
+                        "debate": debate_result,
+                        "trader_decisions": []
+                    }
+
+                    # Traders are independent, so decide concurrently; one failed
+                    # trader doesn't cancel the others
+                    decisions = await asyncio.gather(*[
+                        trader.make_decision(
+                            ticker, date, current_price,
+                            tech_analysis, sent_analysis, debate_result
+                        )
+                        for trader in traders
+                    ], return_exceptions=True)
+
+                    for trader, decision in zip(traders, decisions):
+                        if isinstance(decision, BaseException):
+                            print(f"{trader.name} decision error on {date}: {decision}")
+                            decision = {"agent": trader.name, "model": trader.model_type, "date": date, "error": str(decision) or type(decision).__name__}
+                        day_decisions["trader_decisions"].append(decision)
+
+                    decision_log.write(orjson.dumps(day_decisions, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+        finally:
+            # Drop speculative work if the simulation stops early
+            for task in pending.values():
+                task.cancel()
 
         # Calculate final results
-        final_price = data_loader.get_latest_price(ticker, trading_dates[-1])
+        final_price = price_map.get(trading_dates[-1])
+        if final_price is None:
+            final_price = data_loader.get_latest_price(ticker, trading_dates[-1])
         current_prices = {ticker: final_price}
 
         trader_results = []
@@ -204,23 +308,30 @@ async def _run_simulation_task(
                 "final_cash": portfolio["cash"],
                 "final_holdings": portfolio["holdings"],
                 "total_trades": portfolio["total_trades"],
+                "win_rate": trader.win_rate,
                 "trades": portfolio["trade_history"]
             })
 
-        # Store results
-        simulation_results = {
+        # Store results (summary first, so it's ready as soon as results are)
+        results = {
             "ticker": ticker,
             "start_date": start_date,
             "end_date": end_date,
             "total_days": total_days,
             "final_price": final_price,
             "traders": trader_results,
-            "daily_decisions": all_decisions
+            "decisions_url": "/api/simulation/results/decisions"
         }
+        summary = _build_summary(results)
+        tmp_log_path.replace(log_path)
+        simulation_summary = summary
+        simulation_results = results
 
         simulation_status = {"status": "completed", "progress": 100}
 
     except Exception as e:
+        # Keep the previous run's log, which still matches its results
+        Path(f"{settings.simulation_log_path}.tmp").unlink(missing_ok=True)
         simulation_status = {"status": "error", "error": str(e), "progress": 0}
         print(f"Simulation error: {e}")
 
@@ -230,10 +341,17 @@ async def reset_simulation():
     Reset simulation state
 
     **API Integration Point**: Call from frontend to reset and start fresh
+
+    Returns 409 while a simulation is queued or running.
     """
-    global simulation_results, simulation_status
+    global simulation_results, simulation_summary, simulation_status
+
+    if simulation_status["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="A simulation is running")
 
     simulation_results = {}
+    simulation_summary = {}
     simulation_status = {"status": "idle", "progress": 0}
+    Path(settings.simulation_log_path).unlink(missing_ok=True)
 
     return {"message": "Simulation reset successfully"}
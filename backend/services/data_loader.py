@@ -1,43 +1,125 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional
 import yfinance as yf
 from pathlib import Path
+from config import get_settings
+
+settings = get_settings()
+
+def _sma(closes: np.ndarray, window: int) -> np.ndarray:
+    """Trailing simple moving average via cumulative sums (shorter windows at the start)"""
+    cs = np.concatenate(([0.0], np.cumsum(closes)))
+    ends = np.arange(1, len(closes) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cs[ends] - cs[starts]) / (ends - starts)
+
+def _indicator_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Technical indicators for every bar of a price frame, as numpy columns"""
+    close = df['Close']
+    closes = close.to_numpy(dtype=float)
+    delta = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    return {
+        "sma_20": _sma(closes, 20),
+        "sma_50": _sma(closes, 50),
+        "rsi": rsi.fillna(50).to_numpy(),
+        "current_price": closes,
+        "volume": df['Volume'].to_numpy()
+    }
+
+class _StreamingIndicators:
+    """
+    Indicator state for one ticker, advanced one bar at a time
+
+    SMAs are kept as running sums over the last 20/50 closes and RSI as
+    Wilder's smoothed average gain/loss, so each new bar is O(1).
+    """
+
+    __slots__ = ("last_date", "last_close", "volume", "closes", "sum_20", "sum_50", "avg_gain", "avg_loss")
+
+    def __init__(self, df: pd.DataFrame):
+        close = df['Close']
+        delta = close.diff()
+
+        self.last_date = df.index[-1]
+        self.last_close = float(close.iloc[-1])
+        self.volume = int(df['Volume'].iloc[-1])
+        closes = close.to_numpy(dtype=float)
+
+        self.closes = deque(closes[-50:].tolist(), maxlen=50)
+        self.sum_20 = float(closes[-20:].sum())
+        self.sum_50 = float(closes[-50:].sum())
+        self.avg_gain = float(delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1])
+        self.avg_loss = float((-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1])
+
+    def update(self, date: pd.Timestamp, close: float, volume: int) -> None:
+        """Fold one new bar into the running state"""
+        delta = close - self.last_close
+        self.avg_gain = (self.avg_gain * 13 + max(delta, 0.0)) / 14
+        self.avg_loss = (self.avg_loss * 13 + max(-delta, 0.0)) / 14
+
+        if len(self.closes) >= 20:
+            self.sum_20 -= self.closes[-20]
+        if len(self.closes) == self.closes.maxlen:
+            self.sum_50 -= self.closes[0]
+        self.sum_20 += close
+        self.sum_50 += close
+        self.closes.append(close)
+
+        self.last_date = date
+        self.last_close = close
+        self.volume = volume
+
+    def snapshot(self) -> Dict:
+        """Current indicator values"""
+        if self.avg_loss > 0:
+            rsi = 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+        else:
+            rsi = 100.0 if self.avg_gain > 0 else 50.0
+
+        n = len(self.closes)
+        return {
+            "sma_20": self.sum_20 / min(20, n),
+            "sma_50": self.sum_50 / n,
+            "rsi": rsi,
+            "current_price": self.last_close,
+            "volume": self.volume
+        }
 
 class DataLoader:
     """Load and process market and sentiment data"""
 
     def __init__(self, data_path: str = "backend/data"):
         self.data_path = Path(data_path)
+        self._tables: Dict[str, Dict] = {}  # Per-ticker indicator arrays from the fixed origin
+        self._streams: Dict[str, _StreamingIndicators] = {}  # Per-ticker state past the table's end
+
+    @lru_cache(maxsize=None)
+    def _sentiment_frame(self, filename: str) -> pd.DataFrame:
+        """Read a sentiment CSV once, indexed and sorted by (ticker, date)"""
+        df = pd.read_csv(self.data_path / filename, parse_dates=['date'])
+        return df.set_index(['ticker', 'date']).sort_index()
 
     def load_sentiment_data(self, ticker: str, start_date: str, end_date: str) -> Dict:
         """Load sentiment data from Reddit and Twitter CSV files"""
-        reddit_df = pd.read_csv(self.data_path / "reddit_sentiment.csv")
-        twitter_df = pd.read_csv(self.data_path / "twitter_sentiment.csv")
-
-        # Parse dates
-        reddit_df['date'] = pd.to_datetime(reddit_df['date'])
-        twitter_df['date'] = pd.to_datetime(twitter_df['date'])
-
-        # Filter by ticker and date range
         start = pd.to_datetime(start_date)
         end = pd.to_datetime(end_date)
 
-        reddit_data = reddit_df[
-            (reddit_df['ticker'] == ticker) &
-            (reddit_df['date'] >= start) &
-            (reddit_df['date'] <= end)
-        ]
-
-        twitter_data = twitter_df[
-            (twitter_df['ticker'] == ticker) &
-            (twitter_df['date'] >= start) &
-            (twitter_df['date'] <= end)
-        ]
+        # Slice the sorted (ticker, date) index instead of scanning every row
+        reddit_data = self._sentiment_frame("reddit_sentiment.csv").loc[(ticker, start):(ticker, end)]
+        twitter_data = self._sentiment_frame("twitter_sentiment.csv").loc[(ticker, start):(ticker, end)]
 
         return {
-            "reddit": reddit_data.to_dict('records') if not reddit_data.empty else [],
-            "twitter": twitter_data.to_dict('records') if not twitter_data.empty else [],
+            # Posts column-wise ({column: [values]}), one list per column
+            "reddit": reddit_data.reset_index(level='date')[['date', 'title', 'sentiment']].to_dict('list'),
+            "twitter": twitter_data.reset_index(level='date')[['date', 'text', 'sentiment']].to_dict('list'),
             "reddit_avg_sentiment": float(reddit_data['sentiment'].mean()) if not reddit_data.empty else 0.0,
             "twitter_avg_sentiment": float(twitter_data['sentiment'].mean()) if not twitter_data.empty else 0.0,
             "total_posts": len(reddit_data) + len(twitter_data)
@@ -77,6 +159,14 @@ class DataLoader:
             return float(df['Close'].iloc[-1])
         return 100.0  # fallback
 
+    def load_price_map(self, ticker: str, start_date: str, end_date: str) -> Dict[str, float]:
+        """Get closing prices for a date range in one load, keyed by YYYY-MM-DD"""
+        df = self.load_market_data(ticker, start_date, end_date)
+        return {
+            day: float(close)
+            for day, close in zip(df.index.strftime("%Y-%m-%d"), df['Close'].to_numpy())
+        }
+
     def calculate_technical_indicators(self, df: pd.DataFrame) -> Dict:
         """Calculate technical indicators from price data"""
         if df.empty or len(df) < 14:
@@ -88,24 +178,123 @@ class DataLoader:
                 "signal": 0
             }
 
-        # Simple Moving Averages
-        sma_20 = df['Close'].rolling(window=min(20, len(df))).mean().iloc[-1]
-        sma_50 = df['Close'].rolling(window=min(50, len(df))).mean().iloc[-1]
+        return _StreamingIndicators(df).snapshot()
 
-        # RSI (simplified)
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+    def _indicator_origin(self) -> str:
+        """First date of indicator history: indicator_history_days before start_date"""
+        origin = datetime.fromisoformat(settings.start_date) - timedelta(days=settings.indicator_history_days)
+        return origin.date().isoformat()
 
-        return {
-            "sma_20": float(sma_20) if not pd.isna(sma_20) else 0,
-            "sma_50": float(sma_50) if not pd.isna(sma_50) else 0,
-            "rsi": float(rsi.iloc[-1]) if not pd.isna(rsi.iloc[-1]) else 50,
-            "current_price": float(df['Close'].iloc[-1]),
-            "volume": int(df['Volume'].iloc[-1])
-        }
+    def _build_table(self, prices: pd.DataFrame, origin: pd.Timestamp, end: pd.Timestamp) -> Dict:
+        """Indicator arrays plus the prices they came from and a date -> row index"""
+        table = _indicator_arrays(prices)
+        table["prices"] = prices
+        table["dates_index"] = {day: i for i, day in enumerate(prices.index.strftime("%Y-%m-%d"))}
+        # First and last dates loaded, whether or not they had a bar
+        table["origin"] = origin
+        table["end"] = end
+        return table
+
+    def precompute_indicators(
+        self,
+        ticker: str,
+        origin: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict:
+        """
+        Compute technical indicators for every date of a ticker in one pass
+
+        The table covers at least the configured simulation period plus
+        indicator_history_days of warm-up, and is widened to origin/end_date
+        when those fall outside it, loading just the missing bars. Indicators
+        run from the table's first bar, so a date's values never depend on
+        which later dates were requested; only widening the table backwards
+        re-seeds the warm-up (shifting RSI slightly). SMAs are cumulative-sum
+        differences and RSI uses Wilder's smoothing (an EWM with alpha=1/14),
+        all vectorized over the whole series.
+        """
+        start = min(pd.Timestamp(origin or self._indicator_origin()), pd.Timestamp(self._indicator_origin()))
+        end = max(pd.Timestamp(end_date or settings.end_date), pd.Timestamp(settings.end_date))
+
+        table = self._tables.get(ticker)
+        if table is None:
+            prices = self.load_market_data(ticker, start.date().isoformat(), end.date().isoformat())[['Close', 'Volume']]
+        elif start >= table["origin"] and end <= table["end"]:
+            return table
+        else:
+            parts = [table["prices"]]
+            if start < table["origin"]:
+                day_before = (table["origin"] - timedelta(days=1)).date().isoformat()
+                parts.insert(0, self.load_market_data(ticker, start.date().isoformat(), day_before)[['Close', 'Volume']])
+            else:
+                start = table["origin"]
+            if end > table["end"]:
+                next_day = (table["end"] + timedelta(days=1)).date().isoformat()
+                parts.append(self.load_market_data(ticker, next_day, end.date().isoformat())[['Close', 'Volume']])
+            else:
+                end = table["end"]
+            prices = pd.concat(parts)
+
+        table = self._build_table(prices, start, end)
+        self._tables[ticker] = table
+        # The table now covers what the streaming state had walked through
+        self._streams.pop(ticker, None)
+        return table
+
+    def prefetch_window(self, ticker: str, start_date: str, end_date: str) -> Dict:
+        """
+        Make sure the indicator table covers a simulation window, in one load
+
+        Widens the ticker's table to start_date - indicator_history_days
+        through end_date, so indicators_for reads each day's values directly.
+        """
+        origin = datetime.fromisoformat(start_date) - timedelta(days=settings.indicator_history_days)
+        return self.precompute_indicators(ticker, origin.date().isoformat(), end_date)
+
+    def indicators_for(self, ticker: str, date: str, lookback_days: int = 30) -> Dict:
+        """
+        Get technical indicators for a ticker on a date
+
+        Reads a row of the precomputed indicator table (a non-trading day takes
+        the last bar before it), first widening the table backwards if it has
+        less than lookback_days of history before date. Dates past the table's
+        end continue from it and are kept up to date incrementally as later
+        dates are requested.
+        """
+        timestamp = pd.Timestamp(date)
+        table = self.precompute_indicators(ticker)
+        if timestamp - timedelta(days=lookback_days) < table["origin"]:
+            warm_up = max(lookback_days, settings.indicator_history_days)
+            table = self.precompute_indicators(ticker, (timestamp - timedelta(days=warm_up)).date().isoformat())
+        prices = table["prices"]
+
+        i = table["dates_index"].get(date)
+        if i is None and timestamp <= table["end"]:
+            i = int(prices.index.searchsorted(timestamp, side="right")) - 1
+        if i is not None and i >= 0:
+            return {
+                "sma_20": float(table["sma_20"][i]),
+                "sma_50": float(table["sma_50"][i]),
+                "rsi": float(table["rsi"][i]),
+                "current_price": float(table["current_price"][i]),
+                "volume": int(table["volume"][i])
+            }
+
+        if timestamp > table["end"] and len(prices) >= 14:
+            # Walking forward only loads and folds in the bars not seen yet
+            stream = self._streams.get(ticker)
+            if stream is None or timestamp < stream.last_date:
+                stream = _StreamingIndicators(prices)
+                self._streams[ticker] = stream
+            if timestamp > stream.last_date:
+                next_day = (stream.last_date + timedelta(days=1)).date().isoformat()
+                df = self.load_market_data(ticker, next_day, date)
+                for bar_date, close, volume in zip(df.index, df['Close'].to_numpy(dtype=float), df['Volume'].to_numpy()):
+                    stream.update(bar_date, float(close), int(volume))
+            return stream.snapshot()
+
+        # Too few bars on or before date for indicators
+        return self.calculate_technical_indicators(prices.iloc[:0])
 
 # Global instance
 data_loader = DataLoader()
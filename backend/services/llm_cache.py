@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import orjson
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from pydantic import ValidationError
+
+class LLMCache:
+    """
+    Two-level (memory + SQLite) cache for LLM responses
+
+    Entries are keyed by sha256 of "model|temperature|schema|system|prompt" so replaying a
+    backtest over the same (ticker, date) inputs never re-calls the LLM.
+    The memory level is an LRU holding at most max_memory_entries responses.
+    """
+
+    def __init__(self, path: str = ".llm_cache.sqlite", ttl: Optional[float] = None, max_memory_entries: int = 10000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # Disk reads and writes run in worker threads
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str, schema: str = "", system: str = "") -> str:
+        """Build the cache key for a model call"""
+        return hashlib.sha256(f"{model}|{temperature}|{schema}|{system}|{prompt}".encode()).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl is None or time.time() - created_at < self.ttl
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        hit = self._memory.get(key)
+        if hit is not None and self._is_fresh(hit[1]):
+            self._memory.move_to_end(key)
+            return hit[0]
+        return None
+
+    def _read(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            return self._connect().execute(
+                "SELECT response, created_at FROM cache WHERE key=?", (key,)
+            ).fetchone()
+
+    def _promote(self, key: str, row: Optional[Tuple[str, float]]) -> Optional[str]:
+        # Kept on the caller's thread: the memory LRU isn't thread-safe
+        if row is None or not self._is_fresh(row[1]):
+            return None
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on miss/expiry"""
+        response = self._memory_get(key)
+        if response is None:
+            response = self._promote(key, self._read(key))
+        return response
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Return a cached response, reading from disk in a worker thread"""
+        response = self._memory_get(key)
+        if response is None:
+            response = self._promote(key, await asyncio.to_thread(self._read, key))
+        return response
+
+    def _write(self, key: str, response: str, created_at: float) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, created_at)
+            )
+            conn.commit()
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response in memory and on disk"""
+        created_at = time.time()
+        self._remember(key, response, created_at)
+        self._write(key, response, created_at)
+
+    async def aset(self, key: str, response: str) -> None:
+        """Store a response, writing to disk in a worker thread"""
+        created_at = time.time()
+        self._remember(key, response, created_at)
+        await asyncio.to_thread(self._write, key, response, created_at)
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        self._memory.clear()
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+
+def cached_llm(
+    ttl: Optional[float] = None,
+    path: str = ".llm_cache.sqlite",
+    enabled: bool = True,
+    max_memory_entries: int = 10000
+):
+    """
+    Decorator adding response caching to an async LLMClient.call_* method
+
+    The wrapped method gains a `cache` keyword argument (default True) so
+    callers can opt out per call. `model` and `temperature` are read from the
+    method's own arguments, falling back to its defaults. Only structured
+    replies that validate against the call's response_schema are stored, so
+    free-text or error payloads are never replayed.
+    """
+    llm_cache = LLMCache(path=path, ttl=ttl, max_memory_entries=max_memory_entries)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, prompt: str, *args, cache: bool = True, **kwargs) -> str:
+            if not (enabled and cache):
+                return await func(self, prompt, *args, **kwargs)
+
+            bound = signature.bind(self, prompt, *args, **kwargs)
+            bound.apply_defaults()
+            model = bound.arguments.get("model", func.__name__)
+            temperature = bound.arguments.get("temperature", "")
+            response_schema = bound.arguments.get("response_schema")
+            if response_schema is None:
+                return await func(self, prompt, *args, **kwargs)
+            schema = response_schema.__name__
+            system = bound.arguments.get("system") or ""
+            if not isinstance(system, str):
+                system = orjson.dumps(system, option=orjson.OPT_SORT_KEYS).decode()
+            key = LLMCache.make_key(model, temperature, prompt, schema, system)
+
+            response = await llm_cache.aget(key)
+            if response is None:
+                response = await func(self, prompt, *args, **kwargs)
+                try:
+                    response_schema.model_validate_json(response)
+                except ValidationError:
+                    return response
+                await llm_cache.aset(key, response)
+            return response
+
+        wrapper.cache = llm_cache
+        return wrapper
+
+    return decorator
@@ -1,9 +1,151 @@
+import asyncio
+import httpx
 import json
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, Optional, Type, Union
+from pydantic import BaseModel
 from config import get_settings
+from services.llm_cache import cached_llm
+from services.tokens import count_tokens, metered_llm
 
 settings = get_settings()
 
+# PRODUCTION MODE: set to False once the API calls below are uncommented.
+# Mock replies are never cached, so they can't be replayed after switching.
+MOCK_MODE = True
+
+CACHE_ENABLED = settings.llm_cache_enabled and not MOCK_MODE
+
+response_cache = cached_llm(
+    ttl=settings.llm_cache_ttl,
+    path=settings.llm_cache_path,
+    enabled=CACHE_ENABLED,
+    max_memory_entries=settings.llm_cache_memory_entries
+)
+token_meter = metered_llm(max_prompt_tokens=settings.max_prompt_tokens)
+
+def _mock_payload(model: str, kind: str) -> Dict[str, Any]:
+    """Canned mock reply for a prompt type"""
+    if kind == "technical":
+        return {
+            "analysis": f"{model.upper()} Technical Analysis",
+            "trend": "bullish",
+            "indicators": {
+                "rsi": 65.3,
+                "macd": "positive",
+                "moving_averages": "golden cross"
+            },
+            "recommendation": "BUY",
+            "confidence": 0.75
+        }
+    elif kind == "sentiment":
+        return {
+            "analysis": f"{model.upper()} Sentiment Analysis",
+            "overall_sentiment": 0.42,
+            "reddit_sentiment": 0.38,
+            "twitter_sentiment": 0.46,
+            "key_topics": ["earnings", "product launch", "market growth"],
+            "recommendation": "POSITIVE"
+        }
+    elif kind in ("bull", "bear"):
+        is_bull = kind == "bull"
+        return {
+            "role": kind,
+            "argument": f"Strong {'bullish' if is_bull else 'bearish'} signals based on technical and sentiment data",
+            "key_points": [
+                f"{'Positive' if is_bull else 'Negative'} momentum indicators",
+                f"{'Favorable' if is_bull else 'Unfavorable'} market sentiment",
+                f"{'Strong' if is_bull else 'Weak'} fundamentals"
+            ],
+            "risk_factors": ["market volatility", "economic uncertainty"],
+            "conviction": 0.8 if is_bull else 0.7
+        }
+    elif kind == "trading":
+        # Models size positions differently, so mock portfolios diverge
+        is_claude = model == "claude"
+        return {
+            "action": "BUY",
+            "quantity": 10 if is_claude else 6,
+            "reasoning": f"{model.upper()}: Based on positive technical and sentiment analysis, bullish debate outcome",
+            "confidence": 0.78 if is_claude else 0.66,
+            "risk_level": "MEDIUM"
+        }
+    else:
+        return {"response": f"Mock response from {model}"}
+
+# Prompt keywords selecting a mock reply, in priority order
+_MOCK_KEYWORDS = (
+    ("technical analysis", "technical"),
+    ("sentiment", "sentiment"),
+    ("bull", "bull"),
+    ("bear", "bear"),
+    ("trading decision", "trading")
+)
+_MOCK_KINDS = tuple(kind for _, kind in _MOCK_KEYWORDS) + ("default",)
+_MOCK_DISPATCH = re.compile("|".join(keyword for keyword, _ in _MOCK_KEYWORDS), re.IGNORECASE)
+_MOCK_BEAR_ROLE = re.compile("bear advocate", re.IGNORECASE)
+
+def _mock_structured_payload(model: str, response_schema: Type[BaseModel], role: str) -> Dict[str, Any]:
+    """Mock structured reply: the schema's example, with role/model-specific parts"""
+    payload = dict(response_schema.model_json_schema()["examples"][0])
+    name = response_schema.__name__
+    if name == "DebateArgument":
+        payload = _mock_payload(model, role)
+    elif name == "TradeDecision":
+        payload = _mock_payload(model, "trading")
+    elif name == "CompositeResult":
+        for side in ("bull", "bear"):
+            payload[f"{side}_r1"] = payload[f"{side}_r2"] = _mock_payload(model, side)
+    return payload
+
+def system_blocks(text: str, model: str) -> List[Dict[str, Any]]:
+    """
+    A system prompt as content blocks for call_claude
+
+    The block is marked for Anthropic prompt caching only when it's long
+    enough to qualify: prefixes under 1024 tokens (2048 on Haiku) are never
+    cached, and a cache_control marker on them is silently ignored.
+    """
+    block: Dict[str, Any] = {"type": "text", "text": text}
+    if count_tokens(text) >= (2048 if "haiku" in model else 1024):
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+# Keys of the OpenAPI subset Gemini accepts as a response_schema
+_GEMINI_SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "items", "properties", "required"}
+
+def gemini_schema(response_schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    response_schema's JSON schema reduced to the OpenAPI subset Gemini accepts
+
+    $refs are inlined, Optional[X] becomes a nullable X, and keywords Gemini
+    rejects ($defs, title, examples, bounds, defaults) are dropped.
+    """
+    schema = response_schema.model_json_schema()
+    defs = schema.get("$defs", {})
+
+    def clean(node: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in node:
+            return clean(defs[node["$ref"].rsplit("/", 1)[-1]])
+        if "anyOf" in node:
+            variants = [variant for variant in node["anyOf"] if variant.get("type") != "null"]
+            if len(variants) != 1:
+                raise ValueError(f"Gemini schemas can't express anyOf: {node['anyOf']}")
+            return {**clean(variants[0]), "nullable": True}
+
+        cleaned = {}
+        for key, value in node.items():
+            if key not in _GEMINI_SCHEMA_KEYS:
+                continue
+            if key == "properties":
+                value = {name: clean(prop) for name, prop in value.items()}
+            elif key == "items":
+                value = clean(value)
+            cleaned[key] = value
+        return cleaned
+
+    return clean(schema)
+
 class LLMClient:
     """
     LLM Client for calling Claude and Gemini AI models
@@ -13,109 +155,195 @@ class LLMClient:
     """
 
     def __init__(self):
+        # One pooled HTTP/2 client shared by every agent, so calls reuse warm
+        # connections instead of paying a TCP + TLS handshake each time
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections
+            )
+        )
+
+        # Cap in-flight requests per provider to stay under rate limits
+        self._semaphores = {
+            "claude": asyncio.Semaphore(settings.claude_max_concurrency),
+            "gemini": asyncio.Semaphore(settings.gemini_max_concurrency)
+        }
+
+        # Mock replies are fixed per (model, prompt type) / schema, so serialize them once
+        self._mock_cache: Dict[tuple, str] = {
+            (model, kind): json.dumps(_mock_payload(model, kind))
+            for model in ("claude", "gemini")
+            for kind in _MOCK_KINDS
+        }
+        self._mock_structured: Dict[tuple, str] = {}
+
         # PRODUCTION MODE: Uncomment these lines when you have API keys
         # import anthropic
         # from google import generativeai as genai
         #
-        # self.anthropic_client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        # self.anthropic_client = anthropic.AsyncAnthropic(
+        #     api_key=settings.anthropic_api_key,
+        #     http_client=self._http
+        # )
         # genai.configure(api_key=settings.google_ai_api_key)
-        # self.gemini_model = genai.GenerativeModel('gemini-pro')
-        pass
+        # self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
 
-    async def call_claude(self, prompt: str, model: str = "claude-sonnet-4-20250514", temperature: float = 0.7) -> str:
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool"""
+        await self._http.aclose()
+
+    @response_cache
+    @token_meter
+    async def call_claude(
+        self,
+        prompt: str,
+        model: str = "claude-sonnet-4-20250514",
+        temperature: float = 0.7,
+        response_schema: Optional[Type[BaseModel]] = None,
+        system: Optional[Union[str, List[Dict[str, Any]]]] = None
+    ) -> str:
         """
         Call Claude API
 
+        Structured responses are cached by (model, temperature, prompt); pass cache=False to bypass.
+        If response_schema is given, the reply is forced through a tool whose
+        input_schema is the model's JSON schema, and the tool input is returned
+        as a JSON string that validates against response_schema.
+        `system` may be a list of content blocks; blocks marked with
+        cache_control {"type": "ephemeral"} use Anthropic prompt caching, so a
+        prefix repeated across calls is billed and processed once (only for
+        prefixes long enough to qualify, see system_blocks).
+
         PRODUCTION CODE (uncomment when API keys are set):
         ```python
-        try:
+        kwargs = {}
+        if system is not None:
+            kwargs["system"] = system
+        if response_schema is not None:
+            kwargs["tools"] = [{
+                "name": "emit_result",
+                "description": f"Emit the {response_schema.__name__}",
+                "input_schema": response_schema.model_json_schema()
+            }]
+            kwargs["tool_choice"] = {"type": "tool", "name": "emit_result"}
+
+        # API errors propagate to the caller (and are never cached)
+        async with self._semaphores["claude"]:
             message = await self.anthropic_client.messages.create(
                 model=model,
                 max_tokens=2048,
                 temperature=temperature,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"},
+                **kwargs
             )
-            return message.content[0].text
-        except Exception as e:
-            print(f"Claude API error: {e}")
-            return json.dumps({"error": str(e)})
+        if response_schema is not None:
+            return json.dumps(message.content[0].input)
+        return message.content[0].text
         ```
         """
         # MOCK RESPONSE - Replace with real API call
-        print(f"[MOCK] Claude called with model: {model}")
-        return self._mock_response("claude", prompt)
+        async with self._semaphores["claude"]:
+            print(f"[MOCK] Claude called with model: {model}")
+            if response_schema is not None:
+                system_text = system if isinstance(system, str) else "".join(
+                    block.get("text", "") for block in system or []
+                )
+                return self._mock_structured_response("claude", response_schema, system_text + prompt)
+            return self._mock_response("claude", prompt)
 
 
-    async def call_gemini(self, prompt: str, temperature: float = 0.7) -> str:
+    @response_cache
+    @token_meter
+    async def call_gemini(
+        self,
+        prompt: str,
+        model: str = "gemini-1.5-flash",
+        temperature: float = 0.7,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
         """
         Call Gemini API
 
+        Structured responses are cached by (model, temperature, prompt); pass cache=False to bypass.
+        If response_schema is given, Gemini's JSON mode is constrained to the
+        model's schema (converted by gemini_schema). JSON mode needs
+        google-generativeai >= 0.7 and a Gemini 1.5 model.
+
         PRODUCTION CODE (uncomment when API keys are set):
         ```python
-        try:
-            model = genai.GenerativeModel('gemini-pro')
-            response = await model.generate_content_async(
+        generation_config = {"temperature": temperature}
+        if response_schema is not None:
+            generation_config["response_mime_type"] = "application/json"
+            generation_config["response_schema"] = gemini_schema(response_schema)
+
+        # API errors propagate to the caller (and are never cached)
+        gemini = genai.GenerativeModel(model)
+        async with self._semaphores["gemini"]:
+            response = await gemini.generate_content_async(
                 prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=temperature,
-                )
+                generation_config=generation_config
             )
-            return response.text
-        except Exception as e:
-            print(f"Gemini API error: {e}")
-            return json.dumps({"error": str(e)})
+        return response.text
         ```
         """
         # MOCK RESPONSE - Replace with real API call
-        print(f"[MOCK] Gemini called")
-        return self._mock_response("gemini", prompt)
+        async with self._semaphores["gemini"]:
+            print(f"[MOCK] Gemini called")
+            if response_schema is not None:
+                return self._mock_structured_response("gemini", response_schema, prompt)
+            return self._mock_response("gemini", prompt)
+
+    async def call_claude_batch(
+        self,
+        prompts: List[str],
+        model: str = "claude-sonnet-4-20250514",
+        temperature: float = 0.7,
+        response_schema: Optional[Type[BaseModel]] = None,
+        concurrency: int = 50
+    ) -> List[str]:
+        """
+        Call Claude for many independent prompts concurrently
+
+        At most `concurrency` requests are in flight at once. Responses are
+        returned in the same order as `prompts` and go through the response
+        cache, so an interrupted batch resumes from the cached prefix.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _call(prompt: str) -> str:
+            async with semaphore:
+                return await self.call_claude(
+                    prompt, model=model, temperature=temperature, response_schema=response_schema
+                )
+
+        return await asyncio.gather(*[_call(prompt) for prompt in prompts])
+
+    def _mock_structured_response(self, model: str, response_schema: Type[BaseModel], text: str) -> str:
+        """Generate a mock structured response for the model and debate role"""
+        role = "bear" if _MOCK_BEAR_ROLE.search(text) else "bull"
+        key = (model, response_schema, role)
+        response = self._mock_structured.get(key)
+        if response is None:
+            payload = _mock_structured_payload(model, response_schema, role)
+            response = response_schema.model_validate(payload).model_dump_json()
+            self._mock_structured[key] = response
+        return response
 
     def _mock_response(self, model: str, prompt: str) -> str:
         """Generate mock responses based on prompt type"""
-        if "technical analysis" in prompt.lower():
-            return json.dumps({
-                "analysis": f"{model.upper()} Technical Analysis",
-                "trend": "bullish",
-                "indicators": {
-                    "rsi": 65.3,
-                    "macd": "positive",
-                    "moving_averages": "golden cross"
-                },
-                "recommendation": "BUY",
-                "confidence": 0.75
-            })
-        elif "sentiment" in prompt.lower():
-            return json.dumps({
-                "analysis": f"{model.upper()} Sentiment Analysis",
-                "overall_sentiment": 0.42,
-                "reddit_sentiment": 0.38,
-                "twitter_sentiment": 0.46,
-                "key_topics": ["earnings", "product launch", "market growth"],
-                "recommendation": "POSITIVE"
-            })
-        elif "bull" in prompt.lower() or "bear" in prompt.lower():
-            is_bull = "bull" in prompt.lower()
-            return json.dumps({
-                "role": "bull" if is_bull else "bear",
-                "argument": f"Strong {'bullish' if is_bull else 'bearish'} signals based on technical and sentiment data",
-                "key_points": [
-                    f"{'Positive' if is_bull else 'Negative'} momentum indicators",
-                    f"{'Favorable' if is_bull else 'Unfavorable'} market sentiment",
-                    f"{'Strong' if is_bull else 'Weak'} fundamentals"
-                ],
-                "risk_factors": ["market volatility", "economic uncertainty"],
-                "conviction": 0.8 if is_bull else 0.7
-            })
-        elif "trading decision" in prompt.lower():
-            return json.dumps({
-                "action": "BUY",
-                "quantity": 10,
-                "reasoning": f"{model.upper()}: Based on positive technical and sentiment analysis, bullish debate outcome",
-                "confidence": 0.78,
-                "risk_level": "MEDIUM"
-            })
-        else:
-            return json.dumps({"response": f"Mock response from {model}"})
+        # One case-insensitive scan collects every keyword present; the
+        # highest-priority one picks the reply
+        found = {match.group(0).lower() for match in _MOCK_DISPATCH.finditer(prompt)}
+        kind = next((kind for keyword, kind in _MOCK_KEYWORDS if keyword in found), "default")
+
+        response = self._mock_cache.get((model, kind))
+        if response is None:
+            response = json.dumps(_mock_payload(model, kind))
+        return response
 
 # Global client instance
 llm_client = LLMClient()
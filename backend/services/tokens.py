@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import inspect
+import tiktoken
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Approximate list prices, USD per million tokens: (input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-sonnet": (3.00, 15.00),
+    "claude-haiku": (0.25, 1.25),
+    "gemini": (0.50, 1.50)
+}
+
+# Per-request usage totals, set by the HTTP middleware
+_usage: ContextVar[Optional[Dict[str, float]]] = ContextVar("llm_usage", default=None)
+
+class PromptTooLongError(ValueError):
+    """Raised when a prompt exceeds the configured token budget"""
+
+# Set by load_encoding() at startup; until then (or if it can't be loaded)
+# token counts fall back to a character estimate
+_encoding: Optional[tiktoken.Encoding] = None
+
+async def load_encoding(timeout: float = 10.0) -> None:
+    """
+    Load the cl100k BPE ranks off the event loop
+
+    tiktoken downloads them on first use (set TIKTOKEN_CACHE_DIR to a
+    pre-populated directory to run offline), so this is called once at
+    startup rather than from the request path.
+    """
+    global _encoding
+    try:
+        _encoding = await asyncio.wait_for(
+            asyncio.to_thread(tiktoken.get_encoding, "cl100k_base"), timeout
+        )
+    except Exception as e:
+        print(f"tiktoken encoding unavailable, estimating tokens from length: {e!r}")
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (cl100k BPE, close enough for Claude/Gemini budgeting)"""
+    encoding = _encoding
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def _system_text(system: Optional[Union[str, List[Dict[str, Any]]]]) -> str:
+    if not system:
+        return ""
+    if isinstance(system, str):
+        return system
+    return "".join(block.get("text", "") for block in system)
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call"""
+    for prefix, (input_price, output_price) in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+def start_usage() -> Dict[str, float]:
+    """Begin accumulating LLM usage for the current request"""
+    usage = {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+    _usage.set(usage)
+    return usage
+
+def metered_llm(max_prompt_tokens: Optional[int] = None):
+    """
+    Decorator counting tokens for an async LLMClient.call_* method
+
+    Rejects prompts over max_prompt_tokens with PromptTooLongError and adds
+    input/output tokens and estimated cost to the current request's usage.
+    Apply it inside the response cache so cache hits are free.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, prompt: str, *args, **kwargs) -> str:
+            bound = signature.bind(self, prompt, *args, **kwargs)
+            bound.apply_defaults()
+            model = bound.arguments.get("model", "")
+
+            input_tokens = count_tokens(prompt + _system_text(bound.arguments.get("system")))
+            if max_prompt_tokens is not None and input_tokens > max_prompt_tokens:
+                raise PromptTooLongError(
+                    f"Prompt is {input_tokens} tokens, over the {max_prompt_tokens} token budget"
+                )
+
+            response = await func(self, prompt, *args, **kwargs)
+
+            usage = _usage.get()
+            if usage is not None:
+                output_tokens = count_tokens(response)
+                usage["input_tokens"] += input_tokens
+                usage["output_tokens"] += output_tokens
+                usage["cost_usd"] += estimate_cost(model, input_tokens, output_tokens)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.data_loader import DataLoader
+
+def _prices(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Deterministic business-day prices: each date's bar is independent of the requested range"""
+    index = pd.bdate_range(start_date, end_date)
+    t = np.array([d.toordinal() for d in index], dtype=float)
+    return pd.DataFrame({
+        "Close": 100 + 10 * np.sin(t / 9) + 3 * np.cos(t / 4),
+        "Volume": (1_000_000 + t % 1000).astype(int)
+    }, index=index)
+
+@pytest.fixture
+def loader(monkeypatch) -> DataLoader:
+    data_loader = DataLoader()
+    monkeypatch.setattr(data_loader, "load_market_data", _prices)
+    return data_loader
+
+def test_walked_indicators_match_cold_start(loader):
+    # Walk forward day by day past the precomputed period
+    for day in pd.bdate_range("2021-03-01", "2021-06-15").strftime("%Y-%m-%d"):
+        walked = loader.indicators_for("AAPL", day)
+
+    cold_loader = DataLoader()
+    cold_loader.load_market_data = _prices
+    cold = cold_loader.indicators_for("AAPL", "2021-06-15")
+
+    assert walked == pytest.approx(cold)
+
+def test_sma_50_covers_50_bars(loader):
+    indicators = loader.indicators_for("AAPL", "2021-06-15")
+    closes = _prices("AAPL", "2021-01-01", "2021-06-15")["Close"].to_numpy()
+
+    assert indicators["sma_20"] == pytest.approx(closes[-20:].mean())
+    assert indicators["sma_50"] == pytest.approx(closes[-50:].mean())
+
+def test_prefetch_does_not_change_indicators(loader):
+    inside = "2020-08-14"  # In the configured period's table
+    past = "2021-02-12"  # Past the table's end, so walked forward
+    before = {day: loader.indicators_for("AAPL", day) for day in (inside, past)}
+
+    loader.prefetch_window("AAPL", "2021-01-04", "2021-03-31")
+
+    for day, indicators in before.items():
+        assert loader.indicators_for("AAPL", day) == pytest.approx(indicators)
+
+def test_prefetch_before_origin_loads_once(loader, monkeypatch):
+    calls = []
+    monkeypatch.setattr(loader, "load_market_data", lambda *args: calls.append(args) or _prices(*args))
+
+    loader.prefetch_window("AAPL", "2019-06-03", "2019-06-28")
+    for day in pd.bdate_range("2019-06-03", "2019-06-28").strftime("%Y-%m-%d"):
+        loader.indicators_for("AAPL", day)
+
+    assert len(calls) == 1
+    assert calls[0][1] <= "2019-03-05"  # Covers the window's own warm-up
@@ -0,0 +1,20 @@
+import orjson
+from agents.schemas import CompositeResult
+from services.llm_client import gemini_schema, system_blocks
+
+def test_gemini_schema_is_openapi_subset():
+    schema = gemini_schema(CompositeResult)
+    text = orjson.dumps(schema).decode()
+
+    for keyword in ("$ref", "$defs", "title", "examples", "anyOf", "maximum"):
+        assert keyword not in text
+    # Optional sub-results are inlined and marked nullable
+    assert schema["properties"]["bull_r2"]["nullable"] is True
+    assert schema["properties"]["bull_r2"]["properties"]["conviction"] == {"type": "number"}
+
+def test_system_blocks_cache_only_long_prefixes():
+    short = "You are the BULL advocate.\n" * 20
+    long = "MARKET DATA: price, volume, RSI, moving averages.\n" * 400
+
+    assert "cache_control" not in system_blocks(short, "claude-sonnet-4-20250514")[0]
+    assert system_blocks(long, "claude-sonnet-4-20250514")[0]["cache_control"] == {"type": "ephemeral"}
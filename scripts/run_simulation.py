@@ -11,8 +11,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
 from agents import TechnicalAnalyst, SentimentAnalyst, DebateTeam, Trader
 from services.data_loader import data_loader
-from datetime import datetime, timedelta
-import json
+from services.llm_client import llm_client
+from services.tokens import load_encoding
+import orjson
+import pandas as pd
 
 async def run_simulation(
     ticker: str = "AAPL",
@@ -41,29 +43,29 @@ async def run_simulation(
     ]
 
     # Generate trading dates (skip weekends)
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    trading_dates = []
-
-    current = start
-    while current <= end:
-        if current.weekday() < 5:  # Monday = 0, Friday = 4
-            trading_dates.append(current.strftime("%Y-%m-%d"))
-        current += timedelta(days=1)
+    trading_dates = pd.bdate_range(start_date, end_date).strftime("%Y-%m-%d").tolist()
 
     print(f"Trading {len(trading_dates)} days\n")
 
+    # Load the whole period's prices and indicators once
+    price_map = data_loader.load_price_map(ticker, start_date, end_date)
+    data_loader.prefetch_window(ticker, start_date, end_date)
+
     # Run simulation
     for day_num, date in enumerate(trading_dates, 1):
         print(f"\n--- Day {day_num}: {date} ---")
 
         # Get current price
-        current_price = data_loader.get_latest_price(ticker, date)
+        current_price = price_map.get(date)
+        if current_price is None:
+            current_price = data_loader.get_latest_price(ticker, date)
         print(f"Current Price: ${current_price:.2f}")
 
-        # Run analysis
-        tech_analysis = await technical.analyze(ticker, date)
-        sent_analysis = await sentiment.analyze(ticker, date)
+        # Run analysis (independent, so run concurrently)
+        tech_analysis, sent_analysis = await asyncio.gather(
+            technical.analyze(ticker, date),
+            sentiment.analyze(ticker, date)
+        )
 
         if debug:
             print(f"  Technical: {tech_analysis.get('recommendation')} (confidence: {tech_analysis.get('confidence')})")
@@ -79,13 +81,18 @@ async def run_simulation(
             print(f"  Debate Recommendation: {debate_result['final_decision']['action']}")
 
         # Each trader makes decision
-        for trader in traders:
-            decision = await trader.make_decision(
+        decisions = await asyncio.gather(*[
+            trader.make_decision(
                 ticker, date, current_price,
                 tech_analysis, sent_analysis, debate_result
             )
+            for trader in traders
+        ], return_exceptions=True)
 
-            if debug:
+        for trader, decision in zip(traders, decisions):
+            if isinstance(decision, BaseException):
+                print(f"  {trader.name}: decision failed ({decision!r})")
+            elif debug:
                 print(f"  {trader.name}: {decision['action']} {decision['quantity']} shares")
 
     # Print final results
@@ -93,7 +100,9 @@ async def run_simulation(
     print(f"FINAL RESULTS")
     print(f"{'='*60}\n")
 
-    final_price = data_loader.get_latest_price(ticker, trading_dates[-1])
+    final_price = price_map.get(trading_dates[-1])
+    if final_price is None:
+        final_price = data_loader.get_latest_price(ticker, trading_dates[-1])
     current_prices = {ticker: final_price}
 
     for trader in traders:
@@ -130,16 +139,29 @@ async def run_simulation(
     }
 
     output_file = "simulation_results.json"
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"Results saved to {output_file}")
 
+async def main():
+    # Token counts fall back to an estimate if the encoding can't be loaded
+    await load_encoding()
+    try:
+        await run_simulation(
+            ticker="AAPL",
+            start_date="2020-07-01",
+            end_date="2020-07-10",
+            debug=True
+        )
+    finally:
+        # Release the shared LLM connection pool
+        await llm_client.aclose()
+
 if __name__ == "__main__":
-    # Run simulation
-    asyncio.run(run_simulation(
-        ticker="AAPL",
-        start_date="2020-07-01",
-        end_date="2020-07-10",
-        debug=True
-    ))
+    # Run simulation (on uvloop where available, as the API server does)
+    if sys.platform == "win32":
+        asyncio.run(main())
+    else:
+        import uvloop
+        uvloop.run(main())